@@ -0,0 +1,3 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+# Mikro benchmark'lar - proje kökünden çalıştırılır: python -m Bench.<modül>
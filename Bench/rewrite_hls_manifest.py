@@ -0,0 +1,99 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+# python -m Bench.rewrite_hls_manifest
+# rewrite_hls_manifest'i önceki satır-satır urljoin'li implementasyonla karşılaştırır.
+# Her senaryoda çıktılar byte-byte aynı olmalı; aksi halde AssertionError.
+
+from Public.Proxy.Libs.helpers import rewrite_hls_manifest, is_hls_segment, _cached_urljoin
+from urllib.parse              import urljoin, quote
+from time                      import perf_counter
+import json, re
+
+BASE_URL = "https://cdn.example.com/vod/film/720p/index.m3u8?token=abc"
+REFERER  = "https://site.example.com/izle/film"
+UA       = "Mozilla/5.0 (X11; Linux x86_64) Firefox/130.0"
+
+def eski_rewrite(content: bytes, base_url: str, referer: str = None, user_agent: str = None, force_proxy: bool = False, extra_headers: dict[str, str] | None = None) -> bytes:
+    """Referans: optimizasyon öncesi implementasyon (sonradan eklenen &key=1 işareti dahil)"""
+    try:
+        text = content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content
+
+    if not text.strip().startswith('#EXTM3U'):
+        return content
+
+    new_lines       = []
+    extra_headers_q = f'&extra_headers={quote(json.dumps(extra_headers), safe="")}' if extra_headers else ''
+
+    def proxy(absolute_url):
+        proxy_url = f'/proxy/video?url={quote(absolute_url, safe="")}'
+        if referer:
+            proxy_url += f'&referer={quote(referer, safe="")}'
+        if user_agent:
+            proxy_url += f'&user_agent={quote(user_agent, safe="")}'
+        if force_proxy:
+            proxy_url += '&force_proxy=1'
+        return proxy_url + extra_headers_q
+
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if 'URI="' in line:
+            is_key = stripped.startswith(("#EXT-X-KEY", "#EXT-X-SESSION-KEY"))
+            def replace_uri(match):
+                absolute_url = urljoin(base_url, match.group(1))
+                if force_proxy or not is_hls_segment(absolute_url):
+                    return f'URI="{proxy(absolute_url)}{"&key=1" if is_key else ""}"'
+                return f'URI="{absolute_url}"'
+            new_lines.append(re.sub(r'URI="([^"]+)"', replace_uri, line))
+        elif stripped and not stripped.startswith('#'):
+            absolute_url = urljoin(base_url, stripped)
+            new_lines.append(absolute_url if not force_proxy and is_hls_segment(absolute_url) else proxy(absolute_url))
+        else:
+            new_lines.append(line)
+
+    return '\n'.join(new_lines).encode('utf-8')
+
+def manifest_uret(segment_sayisi: int, stil: str) -> bytes:
+    satirlar = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:6", "#EXT-X-MEDIA-SEQUENCE:0"]
+    for i in range(segment_sayisi):
+        if i % 50 == 0:
+            satirlar.append(f'#EXT-X-KEY:METHOD=AES-128,URI="keys/k{i}.key?t=1",IV=0x{i:032x}')
+        satirlar.append("#EXTINF:6.000,")
+        satirlar.append({
+            "goreceli" : f"seg-{i:05d}.ts?token=abc&exp=999",
+            "mutlak"   : f"https://edge{i % 4}.example.com/vod/film/720p/seg-{i:05d}.ts",
+            "karisik"  : (f"../480p/seg-{i}.ts", f"/root/seg-{i}.ts", f"seg-{i}.ts?", f"http://other.example.com/s{i}.ts", f"  seg {i}.ts  ")[i % 5],
+        }[stil])
+    satirlar.append("#EXT-X-ENDLIST")
+    return "\n".join(satirlar).encode()
+
+def olc(fn, *args, tekrar: int, **kwargs) -> float:
+    baslangic = perf_counter()
+    for _ in range(tekrar):
+        fn(*args, **kwargs)
+    return (perf_counter() - baslangic) / tekrar * 1000
+
+def soguk_rewrite(*args, **kwargs) -> bytes:
+    """urljoin cache'i boşken (manifest ilk kez görülüyor)"""
+    _cached_urljoin.cache_clear()
+    return rewrite_hls_manifest(*args, **kwargs)
+
+def main():
+    print(f"{'segment':>8} | {'stil':>9} | {'force':>5} | {'eski ms':>9} | {'yeni ms':>9} | {'hız':>6} | {'soğuk ms':>9} | {'hız':>6}")
+    for segment_sayisi in (100, 1_000, 10_000):
+        tekrar = max(3, 20_000 // segment_sayisi)
+        for stil in ("goreceli", "mutlak", "karisik"):
+            for force_proxy in (False, True):
+                content = manifest_uret(segment_sayisi, stil)
+                kwargs  = {"referer": REFERER, "user_agent": UA, "force_proxy": force_proxy, "extra_headers": {"Origin": "https://site.example.com"}}
+
+                assert rewrite_hls_manifest(content, BASE_URL, **kwargs) == eski_rewrite(content, BASE_URL, **kwargs), (segment_sayisi, stil, force_proxy)
+
+                eski = olc(eski_rewrite, content, BASE_URL, tekrar=tekrar, **kwargs)
+                yeni  = olc(rewrite_hls_manifest, content, BASE_URL, tekrar=tekrar, **kwargs)
+                soguk = olc(soguk_rewrite, content, BASE_URL, tekrar=tekrar, **kwargs)
+                print(f"{segment_sayisi:>8} | {stil:>9} | {str(force_proxy):>5} | {eski:>9.3f} | {yeni:>9.3f} | {eski / yeni:>5.2f}x | {soguk:>9.3f} | {eski / soguk:>5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+# python -m Bench.segment_cache
+# SegmentCache insert/lookup maliyetini farklı entry sayılarında ölçer.
+# O(1) ise 1k → 10k → 50k geçişinde işlem başı süre sabit kalmalı.
+
+from Public.Proxy.Libs.segment_cache import SegmentCache
+from time                            import perf_counter
+import asyncio
+
+PAYLOAD = b"\x47" * 1024  # 1KB - çok sayıda entry sığsın diye küçük tutuldu
+
+async def _olc(entry_sayisi: int) -> dict[str, float]:
+    # Limit entry_sayisi kadar segment alacak şekilde ayarlanır, sonrası her set'te eviction tetikler
+    cache                = SegmentCache(max_size_mb=1, hard_ttl_seconds=300)
+    cache.max_size_bytes = entry_sayisi * len(PAYLOAD)
+    urls                 = [f"https://cdn.example.com/hls/seg-{i}.ts" for i in range(entry_sayisi * 2)]
+
+    # 1. Doldurma (eviction yok)
+    baslangic = perf_counter()
+    for url in urls[:entry_sayisi]:
+        await cache.set(url, PAYLOAD)
+    doldurma = perf_counter() - baslangic
+
+    # 2. Lookup (hepsi hit)
+    baslangic = perf_counter()
+    for url in urls[:entry_sayisi]:
+        await cache.get(url)
+    lookup = perf_counter() - baslangic
+
+    # 3. Dolu cache'e insert (her set bir LRU eviction yapar)
+    baslangic = perf_counter()
+    for url in urls[entry_sayisi:]:
+        await cache.set(url, PAYLOAD)
+    eviction = perf_counter() - baslangic
+
+    return {
+        "insert_us"       : doldurma / entry_sayisi * 1e6,
+        "lookup_us"       : lookup / entry_sayisi * 1e6,
+        "insert_evict_us" : eviction / entry_sayisi * 1e6,
+    }
+
+async def main():
+    print(f"{'entries':>8} | {'insert µs':>10} | {'lookup µs':>10} | {'insert+evict µs':>16}")
+    for entry_sayisi in (1_000, 10_000, 50_000):
+        sonuc = await _olc(entry_sayisi)
+        print(f"{entry_sayisi:>8} | {sonuc['insert_us']:>10.2f} | {sonuc['lookup_us']:>10.2f} | {sonuc['insert_evict_us']:>16.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
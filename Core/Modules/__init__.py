@@ -66,6 +66,10 @@ async def lifespan(app: FastAPI):
         from Public.Proxy.Libs.helpers import shared_client
         await shared_client.aclose()
 
+    with suppress(Exception):
+        from Public.Proxy.Libs.segment_cache import segment_cache
+        segment_cache.flush()
+
     with suppress(Exception):
         from Public.Home.Libs.provider_client import close_all_provider_clients
         await close_all_provider_clients()
@@ -1,13 +1,35 @@
 # Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
 
-from httpx   import AsyncClient, HTTPStatusError, TimeoutException
-from fastapi import Request
-from typing  import Any
+from CLI             import konsol
+from httpx           import AsyncClient, AsyncHTTPTransport, Limits, HTTPStatusError, TimeoutException
+from fastapi         import Request
+from typing          import Any
+from .response_cache import ResponseCache
+from .provider_guard import NegativeCache, CircuitBreaker
+from .latency        import EndpointLatency
 import asyncio, os, time
 
-_client  = AsyncClient()
 _default = os.getenv("DEFAULT_PROVIDER_URL", "http://px-webservisler:8596")
 
+# Provider bağlantısı - her sayfa görüntüleme bu havuzdan geçer
+# API_HTTP2: off | on (https üzerinde ALPN) | h2c (düz http üzerinde prior-knowledge HTTP/2)
+# API_PROVIDER_UDS: provider aynı makinedeyse Unix socket yolu - URL'deki host yalnızca Host header'ı olur
+_http2_mode  = (os.getenv("API_HTTP2", "off") or "off").strip().lower()
+_uds         = (os.getenv("API_PROVIDER_UDS", "") or "").strip() or None
+_pool_limits = Limits(
+    max_connections           = int(os.getenv("API_POOL_MAX_CONNECTIONS", "100") or "100"),
+    max_keepalive_connections = int(os.getenv("API_POOL_MAX_KEEPALIVE", "20") or "20"),
+    keepalive_expiry          = float(os.getenv("API_POOL_KEEPALIVE_EXPIRY", "30") or "30"),
+)
+_transport   = AsyncHTTPTransport(
+    http2  = _http2_mode in ("on", "true", "1", "h2c"),
+    http1  = _http2_mode != "h2c",
+    uds    = _uds,
+    limits = _pool_limits,
+)
+_client          = AsyncClient(transport=_transport)
+provider_latency = EndpointLatency()
+
 def get_client_headers(request: Request) -> dict[str, str]:
     """İstemci kimlik header'larını provider'a taşımak üzere hazırlar."""
     headers    : dict[str, str] = {}
@@ -42,10 +64,22 @@ _CACHE_TTL = {
     "/get_all_plugins"  : 3600,
     "/get_plugin_names" : 3600,
 }
-_CACHE_MAX_ENTRIES = 512
 
-_cache    : dict[str, tuple[float, Any]] = {}
-_inflight : dict[str, asyncio.Task]      = {}
+# Byte bütçeli LRU - boyut provider yanıt gövdesinden. Süresi dolan entry TTL × STALE_RATIO kadar
+# daha sunulurken arka planda yenilenir; sık okunanlar TTL'in son REFRESH_AHEAD kesrinde yenilenir
+response_cache = ResponseCache(
+    max_size_mb   = int(os.getenv("API_CACHE_MB", "64") or "64"),
+    stale_ratio   = float(os.getenv("API_CACHE_STALE_RATIO", "1.0") or "1.0"),
+    refresh_ahead = float(os.getenv("API_CACHE_REFRESH_AHEAD", "0.1") or "0.1"),
+)
+_inflight      : dict[str, asyncio.Task] = {}
+
+# Provider hataları: endpoint + eklenti başına kısa negatif cache, eklenti başına devre kesici
+negative_cache  = NegativeCache(float(os.getenv("API_NEGATIVE_TTL", "15") or "15"))
+circuit_breaker = CircuitBreaker(
+    threshold    = int(os.getenv("API_BREAKER_THRESHOLD", "5") or "5"),
+    open_seconds = float(os.getenv("API_BREAKER_OPEN_SECONDS", "30") or "30"),
+)
 
 
 class ProviderRequestError(Exception):
@@ -59,34 +93,99 @@ class ProviderRequestError(Exception):
 def _cache_key(endpoint: str, params: dict | None) -> str:
     return f"{endpoint}?{sorted((params or {}).items())}"
 
-def _prune(cache: dict, max_entries: int):
-    now     = time.monotonic()
-    expired = [k for k, (exp, _) in cache.items() if exp <= now]
-    for k in expired:
-        cache.pop(k, None)
-
-    overflow = len(cache) - max_entries
-    if overflow > 0:
-        for key in list(cache.keys())[:overflow]:
-            cache.pop(key, None)
-
 async def _fetch(
     endpoint: str,
     params: dict | None,
     timeout: float | None,
     client_headers: dict[str, str] | None = None,
 ):
+    return (await _fetch_sized(endpoint, params, timeout, client_headers))[0]
+
+async def _fetch_sized(
+    endpoint: str,
+    params: dict | None,
+    timeout: float | None,
+    client_headers: dict[str, str] | None = None,
+) -> tuple[Any, int]:
+    """Negatif cache ve devre kesiciden geçen provider çağrısı - (result, yanıt gövdesinin byte boyutu)"""
+    plugin       = str((params or {}).get("plugin") or "*")
+    negative_key = f"{endpoint}|{plugin}"
+    # Eklentisiz çağrılar (get_all_plugins, get_plugin_names...) birbirinin devresini açmasın
+    breaker_key  = plugin if plugin != "*" else negative_key
+
+    # Aynı eklentide yakın zamanda timeout / 5xx olduysa ya da devre açıksa provider'a gitme
+    if (failed := negative_cache.get(negative_key)) is not None:
+        _raise_cached(endpoint, *failed)
+    if not circuit_breaker.allow(breaker_key):
+        raise ProviderRequestError(503, endpoint)
+
+    try:
+        result = await _request(endpoint, params, timeout, client_headers)
+    except ProviderRequestError as e:
+        # 4xx (bulunamadı vb.) isteğe özgüdür - eklentinin sağlığını göstermez
+        if e.status_code == 429 or e.status_code >= 500:
+            negative_cache.set(negative_key, e.status_code, str(e))
+            circuit_breaker.failure(breaker_key, str(e))
+        else:
+            circuit_breaker.success(breaker_key)
+        raise
+    except ValueError as e:
+        negative_cache.set(negative_key, None, str(e))
+        circuit_breaker.failure(breaker_key, str(e))
+        raise
+    except BaseException:
+        circuit_breaker.release(breaker_key)
+        raise
+
+    circuit_breaker.success(breaker_key)
+    return result
+
+def _raise_cached(endpoint: str, status_code: int | None, message: str):
+    if status_code is not None:
+        raise ProviderRequestError(status_code, endpoint)
+    raise ValueError(message)
+
+async def _request(
+    endpoint: str,
+    params: dict | None,
+    timeout: float | None,
+    client_headers: dict[str, str] | None = None,
+) -> tuple[Any, int]:
+    started = time.perf_counter()
+    ok      = False
     try:
         headers = client_headers or {}
         req     = await _client.get(f"{_default}/api/v1{endpoint}", params=params, timeout=timeout, headers=headers)
         req.raise_for_status()
-        return req.json().get("result")
+        result  = req.json().get("result"), len(req.content)
+        ok      = True
+        return result
     except TimeoutException:
         raise ValueError(f"Provider zaman aşımı: {endpoint}")
     except HTTPStatusError as e:
         raise ProviderRequestError(e.response.status_code, endpoint) from e
     except Exception as e:
         raise ValueError(f"Provider bağlantı hatası: {e}")
+    finally:
+        provider_latency.record(endpoint, time.perf_counter() - started, ok)
+
+def provider_client_stats() -> dict:
+    """Provider bağlantı havuzu durumu ve endpoint başına gecikme histogramları"""
+    # Anlık bağlantı listesi httpcore'un iç detayı - sürüm değişirse sadece bu sayaçlar boş kalır
+    connections = list(getattr(getattr(_transport, "_pool", None), "connections", None) or [])
+    idle        = sum(1 for conn in connections if conn.is_idle())
+    return {
+        "http2"             : _http2_mode,
+        "uds"               : _uds is not None,
+        "max_connections"   : _pool_limits.max_connections,
+        "max_keepalive"     : _pool_limits.max_keepalive_connections,
+        "keepalive_expiry"  : _pool_limits.keepalive_expiry,
+        "connections"       : len(connections),
+        "active"            : len(connections) - idle,
+        "idle"              : idle,
+        "http2_connections" : sum(1 for conn in connections if "HTTP/2" in conn.info()),
+        "latency"           : provider_latency.get_stats(),
+    }
 
 async def fuck_dmca(
     endpoint: str,
@@ -98,24 +197,31 @@ async def fuck_dmca(
     if not ttl:
         return await _fetch(endpoint, params, timeout, client_headers)
 
-    key   = _cache_key(endpoint, params)
-    entry = _cache.get(key)
-    if entry and entry[0] > time.monotonic():
-        return entry[1]
+    key = _cache_key(endpoint, params)
+    if (cached := response_cache.get(endpoint, key)) is not None:
+        result, refresh = cached
+        # Stale ya da süresi dolmak üzere - ziyaretçi beklemez, tek bir arka plan isteği yeniler
+        if refresh and key not in _inflight:
+            _start_fetch(endpoint, key, ttl, params, timeout, client_headers).add_done_callback(_log_refresh_error)
+        return result
 
-    if key in _inflight:
-        return await _inflight[key]
+    task = _inflight.get(key) or _start_fetch(endpoint, key, ttl, params, timeout, client_headers)
+    return await asyncio.shield(task)
 
+def _start_fetch(endpoint: str, key: str, ttl: int, params: dict | None, timeout: float | None, client_headers: dict[str, str] | None) -> asyncio.Task:
+    """Anahtar başına tek provider isteği - bekleyenler ve arka plan yenilemesi aynı task'ı paylaşır"""
     async def _do_fetch():
-        result = await _fetch(endpoint, params, timeout, client_headers)
+        result, size = await _fetch_sized(endpoint, params, timeout, client_headers)
         if result:
-            _cache[key] = (time.monotonic() + ttl, result)
-            _prune(_cache, _CACHE_MAX_ENTRIES)
+            response_cache.set(endpoint, key, result, ttl, size)
         return result
 
-    task = asyncio.create_task(_do_fetch())
+    task           = asyncio.create_task(_do_fetch())
     _inflight[key] = task
-    try:
-        return await task
-    finally:
-        _inflight.pop(key, None)
+    task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())  # Bekleyeni kalmayan hata uyarı üretmesin
+    return task
+
+def _log_refresh_error(task: asyncio.Task):
+    if not task.cancelled() and (error := task.exception()):
+        konsol.print(f"[yellow]Arka plan cache yenileme hatası: {error}[/yellow]")
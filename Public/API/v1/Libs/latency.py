@@ -0,0 +1,72 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from bisect import bisect_left
+
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı - kayıt O(log kova), yüzdelikler kova üst sınırından"""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    __slots__ = ("counts", "total", "errors", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # Son kova: 10 sn üstü
+        self.total  = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float, ok: bool = True):
+        elapsed_ms = seconds * 1000
+        self.counts[bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+        self.total  += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms  = max(self.max_ms, elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """q yüzdeliğinin düştüğü kovanın üst sınırı (ms) - gözlenen en büyük değerle sınırlı"""
+        if not self.total:
+            return 0.0
+
+        target = q * self.total
+        seen   = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and index < len(self.BUCKETS_MS):
+                return round(min(float(self.BUCKETS_MS[index]), self.max_ms), 1)
+            if seen >= target:
+                break
+        return round(self.max_ms, 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "count"   : self.total,
+            "errors"  : self.errors,
+            "avg_ms"  : round(self.sum_ms / self.total, 1) if self.total else 0.0,
+            "p50_ms"  : self.quantile(0.50),
+            "p95_ms"  : self.quantile(0.95),
+            "p99_ms"  : self.quantile(0.99),
+            "max_ms"  : round(self.max_ms, 1),
+            "buckets" : {
+                (f"<={bound}" if index < len(self.BUCKETS_MS) else f">{self.BUCKETS_MS[-1]}"): count
+                for index, (bound, count) in enumerate(zip((*self.BUCKETS_MS, None), self.counts))
+                if count
+            },
+        }
+
+class EndpointLatency:
+    """Provider endpoint'i başına gecikme histogramları"""
+
+    def __init__(self):
+        self._endpoints : dict[str, LatencyHistogram] = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        if (histogram := self._endpoints.get(endpoint)) is None:
+            histogram                 = LatencyHistogram()
+            self._endpoints[endpoint] = histogram
+        histogram.record(seconds, ok)
+
+    def get_stats(self) -> dict:
+        return {endpoint: histogram.as_dict() for endpoint, histogram in sorted(self._endpoints.items())}
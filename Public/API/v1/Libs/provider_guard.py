@@ -0,0 +1,144 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+import time
+
+class NegativeCache:
+    """
+    Başarısız provider çağrılarının kısa süreli cache'i - {endpoint|plugin: (status_code, mesaj)}
+    Ölü bir eklenti her sayfa açılışında tam timeout yakmasın diye aynı hata TTL boyunca
+    provider'a gitmeden tekrar üretilir.
+    """
+
+    def __init__(self, ttl_seconds: float = 15.0, max_items: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_items   = max_items
+
+        # {key: (status_code | None, message, expires_at)}
+        self._cache : OrderedDict[str, tuple[int | None, str, float]] = OrderedDict()
+        self._hits                                                    = 0
+
+    def get(self, key: str) -> tuple[int | None, str] | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            del self._cache[key]
+            return None
+
+        self._hits += 1
+        return entry[0], entry[1]
+
+    def set(self, key: str, status_code: int | None, message: str):
+        if self.ttl_seconds <= 0:
+            return
+        self._cache.pop(key, None)
+        self._cache[key] = (status_code, message, time.monotonic() + self.ttl_seconds)
+        while len(self._cache) > self.max_items:
+            self._cache.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "ttl_seconds" : self.ttl_seconds,
+            "items"       : sum(1 for entry in self._cache.values() if entry[2] > now),
+            "hits"        : self._hits,
+        }
+
+class _Breaker:
+    __slots__ = ("state", "failures", "opened_at", "probing", "trips", "rejected", "last_error")
+
+    def __init__(self):
+        self.state      = "closed"  # closed | open | half_open
+        self.failures   = 0         # Art arda hata sayısı
+        self.opened_at  = 0.0
+        self.probing    = False     # half_open'da deneme isteği uçuşta mı
+        self.trips      = 0
+        self.rejected   = 0
+        self.last_error = None
+
+class CircuitBreaker:
+    """
+    Eklenti başına devre kesici
+    - closed: istekler geçer; threshold kadar art arda hata -> open
+    - open: istekler provider'a gitmeden reddedilir; open_seconds sonra half_open
+    - half_open: tek bir deneme isteği geçer; başarılıysa closed, değilse tekrar open
+    """
+
+    MAX_TRACKED = 1024
+
+    def __init__(self, threshold: int = 5, open_seconds: float = 30.0):
+        self.threshold    = threshold
+        self.open_seconds = open_seconds
+
+        self._breakers : OrderedDict[str, _Breaker] = OrderedDict()
+
+    def _breaker(self, plugin: str) -> _Breaker:
+        breaker = self._breakers.get(plugin)
+        if breaker is None:
+            breaker                = _Breaker()
+            self._breakers[plugin] = breaker
+            if len(self._breakers) > self.MAX_TRACKED:
+                for old in [old for old, b in self._breakers.items() if b.state == "closed" and not b.failures][:len(self._breakers) - self.MAX_TRACKED]:
+                    del self._breakers[old]
+        return breaker
+
+    def allow(self, plugin: str) -> bool:
+        """İstek provider'a gidebilir mi - half_open'da deneme hakkını alır"""
+        if self.threshold <= 0 or (breaker := self._breakers.get(plugin)) is None or breaker.state == "closed":
+            return True
+
+        if breaker.state == "open" and time.monotonic() - breaker.opened_at >= self.open_seconds:
+            breaker.state = "half_open"
+
+        if breaker.state == "half_open" and not breaker.probing:
+            breaker.probing = True
+            return True
+
+        breaker.rejected += 1
+        return False
+
+    def success(self, plugin: str):
+        if (breaker := self._breakers.get(plugin)) is not None:
+            breaker.state    = "closed"
+            breaker.failures = 0
+            breaker.probing  = False
+
+    def failure(self, plugin: str, error: str):
+        if self.threshold <= 0:
+            return
+
+        breaker             = self._breaker(plugin)
+        breaker.failures   += 1
+        breaker.last_error  = error
+        breaker.probing     = False
+        if breaker.state == "half_open" or breaker.failures >= self.threshold:
+            if breaker.state != "open":
+                breaker.trips += 1
+            breaker.state     = "open"
+            breaker.opened_at = time.monotonic()
+
+    def release(self, plugin: str):
+        """Deneme isteği sonuçsuz kaldı (iptal) - sıradaki istek tekrar denesin"""
+        if (breaker := self._breakers.get(plugin)) is not None:
+            breaker.probing = False
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "threshold"    : self.threshold,
+            "open_seconds" : self.open_seconds,
+            "open"         : sum(1 for breaker in self._breakers.values() if breaker.state != "closed"),
+            "plugins"      : {
+                plugin: {
+                    "state"      : breaker.state,
+                    "failures"   : breaker.failures,
+                    "trips"      : breaker.trips,
+                    "rejected"   : breaker.rejected,
+                    "retry_in"   : round(max(0.0, self.open_seconds - (now - breaker.opened_at)), 1) if breaker.state == "open" else 0.0,
+                    "last_error" : breaker.last_error,
+                }
+                for plugin, breaker in self._breakers.items()
+                if breaker.state != "closed" or breaker.failures or breaker.trips
+            },
+        }
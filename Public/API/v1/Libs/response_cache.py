@@ -0,0 +1,139 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+from typing      import Any
+import time
+
+class _Entry:
+    __slots__ = ("endpoint", "result", "ttl", "expires_at", "stale_until", "size", "hits")
+
+    def __init__(self, endpoint: str, result: Any, ttl: float, stale: float, size: int):
+        now              = time.monotonic()
+        self.endpoint    = endpoint
+        self.result      = result
+        self.ttl         = ttl
+        self.expires_at  = now + ttl
+        self.stale_until = now + ttl + stale  # Bu ana kadar süresi dolmuş haliyle sunulabilir
+        self.size        = size
+        self.hits        = 0
+
+class ResponseCache:
+    """
+    fuck_dmca provider yanıt cache'i
+    - LRU: okunan entry sona taşınır; sık açılan listeler tek seferlik aramalarla düşmez
+    - Limit entry sayısı değil byte: entry boyutu provider yanıt gövdesinin uzunluğu
+    - get / set / eviction O(1): LRU sırası tek OrderedDict'te, expiry index endpoint başına
+      OrderedDict'te (endpoint TTL'i sabit, ekleme sırası = bitiş sırası)
+    - Stale-while-revalidate: TTL'i dolan entry TTL × stale_ratio kadar daha sunulur,
+      get yenilenmesi gerektiğini bildirir (arka planda yenileme çağıranın işi)
+    - Refresh-ahead: refresh_hits kadar okunmuş entry'nin TTL'inin son refresh_ahead kesrinde
+      de yenileme istenir - sık açılan sayfalar hiç stale'e düşmez
+    - Endpoint başına hit / stale / miss / eviction sayaçları
+    """
+
+    def __init__(self, max_size_mb: int = 64, stale_ratio: float = 1.0, refresh_ahead: float = 0.1, refresh_hits: int = 3):
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.stale_ratio    = stale_ratio
+        self.refresh_ahead  = refresh_ahead
+        self.refresh_hits   = refresh_hits
+
+        # LRU sırası: {key: entry} - baştaki en az kullanılan
+        self._cache  : OrderedDict[str, _Entry]           = OrderedDict()
+        # Expiry index: {endpoint: {key: stale_until}}
+        self._expiry : dict[str, OrderedDict[str, float]] = {}
+        # {endpoint: {"hits", "stale", "misses", "refreshed", "evictions", "expired", "items", "size"}}
+        self._stats  : dict[str, dict[str, int]]          = {}
+
+        self._total_size = 0
+
+    def _counters(self, endpoint: str) -> dict[str, int]:
+        if (counters := self._stats.get(endpoint)) is None:
+            counters              = {"hits": 0, "stale": 0, "misses": 0, "refreshed": 0, "evictions": 0, "expired": 0, "items": 0, "size": 0}
+            self._stats[endpoint] = counters
+        return counters
+
+    def get(self, endpoint: str, key: str) -> tuple[Any, bool] | None:
+        """(result, yenilenmeli_mi) | None"""
+        entry = self._cache.get(key)
+        now   = time.monotonic()
+        if entry is None or entry.stale_until <= now:
+            if entry is not None:
+                self._remove(key, "expired")
+            self._counters(endpoint)["misses"] += 1
+            return None
+
+        self._cache.move_to_end(key)
+        entry.hits += 1
+
+        if entry.expires_at <= now:
+            self._counters(endpoint)["stale"] += 1
+            return entry.result, True
+
+        self._counters(endpoint)["hits"] += 1
+        return entry.result, entry.hits >= self.refresh_hits and entry.expires_at - now <= entry.ttl * self.refresh_ahead
+
+    def set(self, endpoint: str, key: str, result: Any, ttl: float, size: int):
+        if size > self.max_size_bytes:
+            return
+
+        counters = self._counters(endpoint)
+        if key in self._cache:
+            counters["refreshed"] += 1
+            self._remove(key)
+        self._purge_expired(time.monotonic())
+
+        entry            = _Entry(endpoint, result, ttl, ttl * self.stale_ratio, size)
+        self._cache[key] = entry
+        self._expiry.setdefault(endpoint, OrderedDict())[key] = entry.stale_until
+        self._total_size += size
+
+        counters["items"] += 1
+        counters["size"]  += size
+
+        while self._total_size > self.max_size_bytes and self._cache:
+            self._remove(next(iter(self._cache)), "evictions")
+
+    def _purge_expired(self, now: float):
+        """Sunulamayacak kadar eskiyenler her endpoint'in expiry sırasının başındadır - sadece onlara bakılır"""
+        for expiry in self._expiry.values():
+            while expiry:
+                key, stale_until = next(iter(expiry.items()))
+                if stale_until > now:
+                    break
+                self._remove(key, "expired")
+
+    def _remove(self, key: str, reason: str | None = None):
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+
+        self._expiry[entry.endpoint].pop(key, None)
+        self._total_size -= entry.size
+
+        counters          = self._counters(entry.endpoint)
+        counters["items"] -= 1
+        counters["size"]  -= entry.size
+        if reason:
+            counters[reason] += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "total_items"   : len(self._cache),
+            "total_size_mb" : round(self._total_size / (1024 * 1024), 2),
+            "max_size_mb"   : round(self.max_size_bytes / (1024 * 1024), 2),
+            "stale_ratio"   : self.stale_ratio,
+            "refresh_ahead" : self.refresh_ahead,
+            "endpoints"     : {
+                endpoint: {
+                    "items"     : counters["items"],
+                    "size_kb"   : round(counters["size"] / 1024, 1),
+                    "hits"      : counters["hits"],
+                    "stale"     : counters["stale"],
+                    "misses"    : counters["misses"],
+                    "refreshed" : counters["refreshed"],
+                    "evictions" : counters["evictions"],
+                    "expired"   : counters["expired"],
+                }
+                for endpoint, counters in self._stats.items()
+            },
+        }
@@ -18,6 +18,7 @@ async def get_api_v1_router(request: Request):
 from . import (
     health,
     schema,
+    stats,
     get_plugin_names,
     get_all_plugins,
     get_plugin,
@@ -26,5 +27,6 @@ from . import (
     load_item,
     load_links,
     extract,
-    ytdlp_extract
+    ytdlp_extract,
+    batch
 )
@@ -0,0 +1,97 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from Core              import Request, JSONResponse
+from fastapi.responses import StreamingResponse
+from typing            import Any
+from .                 import api_v1_router, api_v1_global_message
+from ..Libs            import fuck_dmca, get_client_headers, ProviderRequestError
+import asyncio, json, os
+
+# Toplu çağrıda sadece cache'lenen liste/detay endpoint'leri - rate limit toplu isteği tek sayar,
+# load_links / extract / ytdlp-extract gibi pahalı ve cache'siz çağrılar tekil endpoint'lerinden yapılmalı
+_BATCH_ENDPOINTS = (
+    "/get_plugin_names",
+    "/get_all_plugins",
+    "/get_plugin",
+    "/get_main_page",
+    "/search",
+    "/load_item",
+)
+
+# Toplu istek rate limit'te tek istek sayılır - işlem sayısı sınırlı
+_BATCH_MAX_OPERATIONS = int(os.getenv("API_BATCH_MAX_OPERATIONS", "20") or "20")
+
+def _parse_operations(veri: Any) -> list:
+    operations = veri.get("operations") if isinstance(veri, dict) else veri
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations: boş olmayan bir liste olmalı")
+    if len(operations) > _BATCH_MAX_OPERATIONS:
+        raise ValueError(f"operations: en fazla {_BATCH_MAX_OPERATIONS} işlem gönderilebilir")
+    return operations
+
+async def _run_operation(index: int, operation: Any, client_headers: dict[str, str]) -> dict:
+    """Tek işlem - hata yükseltmez, işlemin sonucunu ya da hatasını döndürür"""
+    if not isinstance(operation, dict):
+        return {"id": index, "success": False, "error": "İşlem {endpoint, params} nesnesi olmalı"}
+
+    op_id    = operation.get("id", index)
+    endpoint = operation.get("endpoint")
+    params   = operation.get("params") or {}
+    if endpoint not in _BATCH_ENDPOINTS:
+        return {"id": op_id, "endpoint": endpoint, "success": False, "error": f"Desteklenmeyen endpoint: {endpoint}"}
+    if not isinstance(params, dict):
+        return {"id": op_id, "endpoint": endpoint, "success": False, "error": "params bir nesne olmalı"}
+
+    # Query string ile gelen tekil isteklerle aynı cache anahtarı / coalescing için değerler string'e çevrilir
+    params = {str(key): value if isinstance(value, str) else json.dumps(value) for key, value in params.items() if value is not None}
+
+    try:
+        result = await fuck_dmca(endpoint, params=params, client_headers=client_headers)
+    except ProviderRequestError as e:
+        return {"id": op_id, "endpoint": endpoint, "success": False, "provider_error": {
+            "code"        : "PROVIDER_HTTP_ERROR",
+            "status_code" : e.status_code,
+            "endpoint"    : e.endpoint,
+            "retryable"   : e.status_code == 429 or e.status_code >= 500,
+        }}
+    except Exception as e:
+        return {"id": op_id, "endpoint": endpoint, "success": False, "error": str(e)}
+
+    return {"id": op_id, "endpoint": endpoint, "success": True, "result": result}
+
+async def _ndjson(tasks: list[asyncio.Task]):
+    """Her işlem bittiği anda bir satır - istemci koparsa kalanlar iptal edilir (paylaşılan provider isteği sürer)"""
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield (json.dumps(await next_done, ensure_ascii=False) + "\n").encode()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@api_v1_router.post("/batch")
+async def batch(request:Request):
+    """
+    Birden çok provider çağrısı tek istekte - işlemler fuck_dmca üzerinden eşzamanlı çalışır
+    Gövde: [{"endpoint": "/get_main_page", "params": {...}}, ...] ya da {"operations": [...], "stream": true}
+    Accept: application/x-ndjson (ya da ?stream=1) ile her sonuç bittiği anda ayrı satır olarak akar
+    """
+    try:
+        # Query string varsa middleware gövdeyi okumamıştır
+        veri       = await request.json() if request.query_params else request.state.veri
+        operations = _parse_operations(veri)
+    except Exception as e:
+        return JSONResponse(status_code=422, content={"success": False, "message": str(e)})
+
+    client_headers = get_client_headers(request)
+    stream         = (
+        "application/x-ndjson" in request.headers.get("Accept", "")
+        or request.query_params.get("stream") in ("1", "true")
+        or (isinstance(veri, dict) and veri.get("stream") is True)
+    )
+
+    if not stream:
+        results = await asyncio.gather(*(_run_operation(index, operation, client_headers) for index, operation in enumerate(operations)))
+        return {**api_v1_global_message, "results": results}
+
+    tasks = [asyncio.create_task(_run_operation(index, operation, client_headers)) for index, operation in enumerate(operations)]
+    return StreamingResponse(_ndjson(tasks), media_type="application/x-ndjson")
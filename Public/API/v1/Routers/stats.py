@@ -0,0 +1,14 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from .      import api_v1_router
+from ..Libs import response_cache, negative_cache, circuit_breaker, provider_client_stats
+
+@api_v1_router.get("/stats")
+async def api_stats():
+    """Provider yanıt cache'i, negatif cache, eklenti devre kesicisi ve bağlantı havuzu istatistikleri"""
+    return {
+        "response_cache"  : response_cache.get_stats(),
+        "negative_cache"  : negative_cache.get_stats(),
+        "circuit_breaker" : circuit_breaker.get_stats(),
+        "provider_client" : provider_client_stats(),
+    }
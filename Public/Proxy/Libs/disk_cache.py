@@ -0,0 +1,208 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from CLI         import konsol
+from collections import OrderedDict
+from pathlib     import Path
+from hashlib     import sha1
+from time        import time
+import asyncio, json, os
+
+class DiskSegmentCache:
+    """
+    L2 segment cache - /dev/shm veya yerel SSD dizini üzerinde
+    - Byte bütçesi aşılınca en az kullanılan (LRU) dosyalar silinir
+    - Index diskte tutulur (index.json), restart sonrası sıcak segmentler kaybolmaz
+    - İçerik sadece okunduğu istek süresince bellekte durur, kalıcı kopya diskte
+    - created_at ve upstream validator'ları (ETag, Last-Modified) index'te saklanır; L1'e
+      geri çıkan segment TTL'ini ve 304 doğrulamasını kaybetmez
+    - Index süreç içidir; aynı dizin birden fazla worker arasında paylaşılmamalı
+    """
+
+    INDEX_FILE  = "index.json"
+    FLUSH_EVERY = 64  # Bu kadar index değişikliğinde bir diske yaz
+
+    def __init__(self, directory: str, max_size_mb: int = 1024, ttl_seconds: int = 3600):
+        self.directory      = Path(directory)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.ttl_seconds    = ttl_seconds
+
+        # LRU sırası: {url: (dosya_adi, created_at, size, validators)} - created_at duvar saati, restart'ı atlatır
+        self._index      : OrderedDict[str, tuple[str, float, int, tuple | None]] = OrderedDict()
+        self._total_size                                                          = 0
+        self._dirty                                                               = 0
+        self._flush_task : asyncio.Task | None                                    = None
+        self._writing    : set[str]                                               = set()
+        self._hits                                                                = 0
+        self._misses                                                              = 0
+        self.enabled                                                              = True
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+        except Exception as hata:
+            self.enabled = False
+            konsol.print(f"[yellow]L2 segment cache devre dışı ({self.directory}): {hata}[/yellow]")
+
+    @staticmethod
+    def _file_name(url: str) -> str:
+        return f"{sha1(url.encode('utf-8')).hexdigest()}.seg"
+
+    def _load_index(self):
+        """index.json'u okur, dosyası kaybolmuş/süresi dolmuş kayıtları ve yetim dosyaları temizler"""
+        index_path = self.directory / self.INDEX_FILE
+        kayitlar   = []
+        if index_path.exists():
+            try:
+                kayitlar = json.loads(index_path.read_text(encoding="utf-8"))
+            except Exception:
+                kayitlar = []
+
+        now = time()
+        for url, file_name, created_at, size, *validators in kayitlar:
+            path = self.directory / file_name
+            if now - created_at > self.ttl_seconds or not path.exists() or path.stat().st_size != size:
+                continue
+            # Eski index formatında validator alanı yok
+            self._index[url]  = (file_name, created_at, size, tuple(validators[0]) if validators and validators[0] else None)
+            self._total_size += size
+
+        # Index'te olmayan dosyalar (yarım yazılmış .tmp dahil) yer kaplamasın
+        bilinen = {entry[0] for entry in self._index.values()}
+        for path in self.directory.iterdir():
+            if path.suffix in (".seg", ".tmp") and path.name not in bilinen:
+                path.unlink(missing_ok=True)
+
+        self._evict_if_needed()
+        self.flush()
+
+    def _snapshot(self) -> list:
+        return [[url, file_name, created_at, size, validators] for url, (file_name, created_at, size, validators) in self._index.items()]
+
+    def _write_index(self, kayitlar: list):
+        tmp_path = self.directory / f"{self.INDEX_FILE}.tmp"
+        tmp_path.write_text(json.dumps(kayitlar), encoding="utf-8")
+        os.replace(tmp_path, self.directory / self.INDEX_FILE)
+
+    def flush(self):
+        """Index'i atomik olarak diske yazar (LRU sırası korunur)"""
+        if not self.enabled:
+            return
+
+        self._write_index(self._snapshot())
+        self._dirty = 0
+
+    def _mark_dirty(self):
+        self._dirty += 1
+        if self._dirty < self.FLUSH_EVERY or (self._flush_task and not self._flush_task.done()):
+            return
+
+        try:
+            # Snapshot event loop'ta alınır, sadece dosya yazımı thread'e gider
+            self._flush_task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._write_index, self._snapshot()))
+            self._dirty      = 0
+        except RuntimeError:
+            pass  # Loop dışında (açılış temizliği) - flush() zaten çağrılıyor
+
+    def _write_file(self, file_name: str, content: bytes):
+        tmp_path = self.directory / f"{file_name}.tmp"
+        with open(tmp_path, "wb") as dosya:
+            dosya.write(content)
+        os.replace(tmp_path, self.directory / file_name)
+
+    def _read_file(self, file_name: str) -> bytes | None:
+        try:
+            with open(self.directory / file_name, "rb") as dosya:
+                return dosya.read() or None
+        except FileNotFoundError:
+            # Eviction ile yarışta silinmiş
+            return None
+
+    def _remove(self, url: str):
+        entry = self._index.pop(url, None)
+        if entry is None:
+            return
+
+        self._total_size -= entry[2]
+        (self.directory / entry[0]).unlink(missing_ok=True)
+        self._mark_dirty()
+
+    def _evict_if_needed(self):
+        while self._total_size > self.max_size_bytes and self._index:
+            self._remove(next(iter(self._index)))
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._index
+
+    async def get(self, url: str) -> tuple[bytes, float, tuple | None] | None:
+        """(content, created_at, validators) oku ve LRU sırasını güncelle"""
+        entry = self._index.get(url) if self.enabled else None
+        if entry is None:
+            self._misses += 1
+            return None
+
+        file_name, created_at, _, validators = entry
+        if time() - created_at > self.ttl_seconds:
+            self._remove(url)
+            self._misses += 1
+            return None
+
+        self._index.move_to_end(url)
+        content = await asyncio.to_thread(self._read_file, file_name)
+        if content is None:
+            self._remove(url)
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return content, created_at, validators
+
+    def refresh(self, url: str, created_at: float, validators: tuple | None) -> bool:
+        """
+        Zaten L2'de olan segment'i yeniden yazmadan en sona taşı, yaşını ve validator'larını güncelle
+        Diskteki gövdenin aynı sürüm olduğu validator'larla kanıtlanamıyorsa False (yeniden yazılmalı)
+        """
+        entry = self._index.get(url)
+        if entry is None or not validators or entry[3] != validators:
+            return False
+
+        self._index[url] = (entry[0], created_at, entry[2], validators)
+        self._index.move_to_end(url)
+        self._mark_dirty()
+        return True
+
+    async def set(self, url: str, content: bytes, created_at: float | None = None, validators: tuple | None = None):
+        """Segment'i diske yaz, bütçe aşılırsa LRU dosyaları sil"""
+        size = len(content)
+        if not self.enabled or size > self.max_size_bytes or url in self._writing:
+            return
+
+        file_name = self._file_name(url)
+        self._writing.add(url)
+        try:
+            await asyncio.to_thread(self._write_file, file_name, content)
+        except Exception as hata:
+            konsol.print(f"[yellow]L2 yazma hatası: {hata}[/yellow]")
+            return
+        finally:
+            self._writing.discard(url)
+
+        # Aynı URL daha önce yazıldıysa eski boyutu düş (dosya os.replace ile zaten değişti)
+        if old := self._index.pop(url, None):
+            self._total_size -= old[2]
+
+        self._index[url]  = (file_name, created_at or time(), size, validators)
+        self._total_size += size
+        self._mark_dirty()
+        self._evict_if_needed()
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled"       : self.enabled,
+            "directory"     : str(self.directory),
+            "total_items"   : len(self._index),
+            "total_size_mb" : round(self._total_size / (1024 * 1024), 2),
+            "max_size_mb"   : round(self.max_size_bytes / (1024 * 1024), 2),
+            "ttl_minutes"   : self.ttl_seconds // 60,
+            "hits"          : self._hits,
+            "misses"        : self._misses,
+        }
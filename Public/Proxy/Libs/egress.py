@@ -0,0 +1,273 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict, deque
+from time        import monotonic
+from typing      import AsyncIterator
+from Settings    import EGRESS_GLOBAL_MBPS, EGRESS_CLIENT_MBPS, EGRESS_STREAM_MBPS, EGRESS_BURST_KB
+import asyncio, ipaddress
+
+PRIORITY_HIGH   = 0  # Akarak rewrite edilen manifest'ler
+PRIORITY_NORMAL = 1  # HLS segment'leri
+PRIORITY_BULK   = 2  # Progresif video, byte-range okumaları
+
+_PRIORITY_NAMES = ("high", "normal", "bulk")
+
+def _mask_ip(ip: str) -> str:
+    """/proxy/stats herkese açık - izleyici IP'si yerine /24 (IPv6: /48) ağı gösterilir"""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return "?"
+    return str(ipaddress.ip_network(f"{address}/{24 if address.version == 4 else 48}", strict=False))
+
+class _TokenBucket:
+    """Saniyede rate byte dolan, en fazla capacity biriktiren kova - büyük gönderimde borca girer"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate     = rate
+        self.capacity = capacity
+        self.tokens   = capacity
+        self.updated  = monotonic()
+
+    def _refill(self, now: float):
+        self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, size: int, now: float) -> float:
+        """size byte harca - oluşan borcun ödenmesi için beklenecek süre"""
+        self._refill(now)
+        self.tokens -= size
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def wait_for(self, size: int, now: float) -> float:
+        """size byte'lık gönderim için (kapasiteyle sınırlı) token birikme süresi"""
+        self._refill(now)
+        need = min(size, self.capacity) - self.tokens
+        return need / self.rate if need > 0 else 0.0
+
+class _Client:
+    """Tek bir istemci IP'sinin kovası, DRR açığı ve trafik sayaçları"""
+
+    __slots__ = ("ip", "bucket", "streams", "bytes", "rate", "deficit", "throttled", "last", "_window_start", "_window_bytes")
+
+    def __init__(self, ip: str, bucket: _TokenBucket | None):
+        self.ip            = ip
+        self.bucket        = bucket
+        self.streams       = 0
+        self.bytes         = 0
+        self.rate          = 0.0  # bytes/s (EWMA)
+        self.deficit       = 0    # Adil kuyrukta biriken gönderim hakkı
+        self.throttled     = 0.0  # Limitler yüzünden beklenen toplam süre
+        self.last          = monotonic()
+        self._window_start = self.last
+        self._window_bytes = 0
+
+    def sent(self, size: int, now: float, window: float):
+        self.bytes         += size
+        self._window_bytes += size
+        self.last           = now
+
+        elapsed = now - self._window_start
+        if elapsed >= window:
+            current            = self._window_bytes / elapsed
+            self.rate          = current if not self.rate else self.rate * 0.7 + current * 0.3
+            self._window_start = now
+            self._window_bytes = 0
+
+class _Flow:
+    """Tek bir client stream'i"""
+
+    __slots__ = ("client", "url", "priority", "bucket")
+
+    def __init__(self, client: _Client, url: str, priority: int, bucket: _TokenBucket | None):
+        self.client   = client
+        self.url      = url
+        self.priority = priority
+        self.bucket   = bucket
+
+class EgressScheduler:
+    """
+    Proxy stream'leri için byte düzeyinde çıkış zamanlayıcısı
+    - Stream ve IP başına token bucket limitleri (Mbit/s)
+    - Global limit doluyken gönderimler öncelik sınıfına göre (manifest > segment > bulk) kuyruğa
+      girer; aynı sınıftaki IP'ler deficit round-robin ile byte bazında adil paylaşır,
+      düşük sınıflar gönderimlerin 1/LOW_SHARE'ini alır
+    - Limit tanımlı değilse sadece IP başına trafik sayılır, stream'ler beklemez
+    - Bellekten sunulan gövdeler (segment / manifest / key cache'i, paylaşılan fetch'ler) charge ile
+      aynı kovalara sayılır - limitler sadece akan stream'lere değil tüm çıkışa uygulanır
+    """
+
+    QUANTUM     = 64 * 1024  # DRR turu başına IP'ye verilen gönderim hakkı
+    LOW_SHARE   = 4          # Her LOW_SHARE gönderimden biri bekleyen en düşük sınıfa - bulk aç kalmaz
+    RATE_WINDOW = 1.0        # Seconds - IP hız ölçüm penceresi
+    MAX_CLIENTS = 1024       # Takip edilen en fazla (boştaki) IP
+    MAX_LISTED  = 50
+
+    def __init__(self, global_mbps: float = 0.0, client_mbps: float = 0.0, stream_mbps: float = 0.0, burst_kb: int = 256):
+        self.global_rate = global_mbps * 1e6 / 8
+        self.client_rate = client_mbps * 1e6 / 8
+        self.stream_rate = stream_mbps * 1e6 / 8
+        self.burst       = max(1, burst_kb) * 1024
+
+        self._global  = _TokenBucket(self.global_rate, self.burst) if self.global_rate > 0 else None
+        self._clients : OrderedDict[str, _Client]                 = OrderedDict()
+        # Öncelik sınıfı başına {ip: deque[(future, size)]} - global limit kuyruğu
+        self._queues  : list[OrderedDict[str, deque]]             = [OrderedDict() for _ in _PRIORITY_NAMES]
+        self._pump    : asyncio.Task | None                       = None
+        self._grants                                              = 0
+
+        self._bytes_total = 0
+        self._delayed     = 0    # Beklemek zorunda kalan gönderim sayısı
+        self._throttled   = 0.0  # Toplam bekleme süresi
+
+    @property
+    def limited(self) -> bool:
+        return bool(self._global or self.client_rate > 0 or self.stream_rate > 0)
+
+    def open(self, ip: str, url: str, priority: int) -> _Flow:
+        client = self._clients.get(ip)
+        if client is None:
+            client            = _Client(ip, _TokenBucket(self.client_rate, self.burst) if self.client_rate > 0 else None)
+            self._clients[ip] = client
+            if len(self._clients) > self.MAX_CLIENTS:
+                for old in [old for old, c in self._clients.items() if not c.streams][:len(self._clients) - self.MAX_CLIENTS]:
+                    del self._clients[old]
+        else:
+            self._clients.move_to_end(ip)
+
+        client.streams += 1
+        return _Flow(client, url, priority, _TokenBucket(self.stream_rate, self.burst) if self.stream_rate > 0 else None)
+
+    def close(self, flow: _Flow):
+        flow.client.streams -= 1
+
+    def _admit(self, flow: _Flow, size: int):
+        """Gönderim hemen yapılabiliyorsa None, değilse beklenecek awaitable"""
+        now    = monotonic()
+        client = flow.client
+        client.sent(size, now, self.RATE_WINDOW)
+        self._bytes_total += size
+
+        delay = flow.bucket.take(size, now) if flow.bucket else 0.0
+        if client.bucket:
+            delay = max(delay, client.bucket.take(size, now))
+
+        if self._global is None:
+            return self._wait(flow, size, delay) if delay else None
+
+        # Kuyruk boşken ve token varken adil sıraya girmeye gerek yok
+        if not delay and not any(self._queues) and not self._global.wait_for(size, now):
+            self._global.take(size, now)
+            return None
+
+        return self._wait(flow, size, delay)
+
+    async def _wait(self, flow: _Flow, size: int, delay: float):
+        start          = monotonic()
+        self._delayed += 1
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+
+            if self._global is not None:
+                future = asyncio.get_running_loop().create_future()
+                self._queues[flow.priority].setdefault(flow.client.ip, deque()).append((future, size))
+                if self._pump is None or self._pump.done():
+                    self._pump = asyncio.create_task(self._run_pump())
+                await future
+        finally:
+            waited                 = monotonic() - start
+            self._throttled       += waited
+            flow.client.throttled += waited
+
+    async def _run_pump(self):
+        """Global kovadan sırayla gönderim hakkı dağıtır - önce yüksek öncelik, sınıf içinde DRR"""
+        while queues := [queue for queue in self._queues if queue]:
+            queue        = queues[-1] if len(queues) > 1 and self._grants % self.LOW_SHARE == self.LOW_SHARE - 1 else queues[0]
+            ip, waiters  = next(iter(queue.items()))
+            future, size = waiters[0]
+
+            # Bekleyen stream koptu - hak harcamadan geç
+            if future.done():
+                waiters.popleft()
+                if not waiters:
+                    del queue[ip]
+                continue
+
+            client = self._clients.get(ip)
+            if client is not None and client.deficit < size:
+                client.deficit += self.QUANTUM
+                queue.move_to_end(ip)
+                continue
+
+            if wait := self._global.wait_for(size, monotonic()):
+                await asyncio.sleep(wait)
+                continue
+
+            self._global.take(size, monotonic())
+            self._grants += 1
+            waiters.popleft()
+            if client is not None:
+                client.deficit -= size
+            if waiters:
+                queue.move_to_end(ip)
+            else:
+                del queue[ip]
+                if client is not None:
+                    client.deficit = 0
+            future.set_result(None)
+
+    async def pace(self, chunks: AsyncIterator[bytes], ip: str, url: str, priority: int) -> AsyncIterator[bytes]:
+        """chunks'ı limitlere ve adil paylaşıma göre hızını ayarlayarak yield eder"""
+        flow = self.open(ip, url, priority)
+        try:
+            async for chunk in chunks:
+                if (wait := self._admit(flow, len(chunk))) is not None:
+                    await wait
+                yield chunk
+        finally:
+            self.close(flow)
+            await chunks.aclose()
+
+    async def charge(self, size: int, ip: str, url: str, priority: int):
+        """Bellekteki tek parça gövdeyi göndermeden önce limitlere say - gerekirse bekle"""
+        flow = self.open(ip, url, priority)
+        try:
+            if (wait := self._admit(flow, size)) is not None:
+                await wait
+        finally:
+            self.close(flow)
+
+    def get_stats(self) -> dict:
+        now     = monotonic()
+        clients = sorted(self._clients.values(), key=lambda client: (client.streams, client.rate), reverse=True)
+
+        def mbps(client: _Client) -> float:
+            # Uzun süredir göndermeyen IP'nin eski hızı gösterilmez
+            return round(client.rate * 8 / 1e6, 2) if now - client.last < self.RATE_WINDOW * 3 else 0.0
+
+        return {
+            "limited"       : self.limited,
+            "global_mbps"   : round(self.global_rate * 8 / 1e6, 2),
+            "client_mbps"   : round(self.client_rate * 8 / 1e6, 2),
+            "stream_mbps"   : round(self.stream_rate * 8 / 1e6, 2),
+            "bytes_total"   : self._bytes_total,
+            "delayed"       : self._delayed,
+            "throttled_sec" : round(self._throttled, 2),
+            "queued"        : {name: sum(len(waiters) for waiters in queue.values()) for name, queue in zip(_PRIORITY_NAMES, self._queues)},
+            "clients"       : [
+                {
+                    "network"       : _mask_ip(client.ip),
+                    "streams"       : client.streams,
+                    "bytes"         : client.bytes,
+                    "mbps"          : mbps(client),
+                    "throttled_sec" : round(client.throttled, 2),
+                }
+                for client in clients[:self.MAX_LISTED]
+            ],
+        }
+
+# Global zamanlayıcı
+egress_scheduler = EgressScheduler(EGRESS_GLOBAL_MBPS, EGRESS_CLIENT_MBPS, EGRESS_STREAM_MBPS, EGRESS_BURST_KB)
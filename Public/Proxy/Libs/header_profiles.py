@@ -0,0 +1,109 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+from base64      import urlsafe_b64encode, urlsafe_b64decode
+from hashlib     import sha1
+from time        import monotonic
+from Settings    import HEADER_PROFILES, HEADER_PROFILE_TTL
+import json, zlib
+
+class HeaderProfileStore:
+    """
+    Upstream header setleri (referer, user_agent, extra_headers) için kompakt profil id'leri
+    - Manifest rewrite edilirken set bir kez kaydedilir, URL'lere sadece &hp=<id> eklenir
+    - Segment URL'leri kısa id taşır (setin hash'i, 12 karakter) - binlerce satırlık VOD playlist'i şişmez;
+      kısa id sadece bellekteki depoda çözülür, playlist her sunuluşunda kayıt tazelenir
+    - Playlist / key / EXT-X-MAP gibi az sayıdaki URL setin kendisini taşır (sıkıştırılmış + base64url):
+      restart ya da LRU'dan düşme sonrası da çözülür, oynatıcı playlist'i yenileyince kısa id'ler de geri gelir
+    - Aynı set her zaman aynı id'leri (ve aynı rewrite çıktısını) verir
+    - Id'yi elle üretmek, referer/user_agent/extra_headers parametrelerini vermekten fazla yetki sağlamaz
+    """
+
+    MAX_DECODED = 8 * 1024  # Çözülmüş profilin üst sınırı (byte)
+
+    def __init__(self, enabled: bool = True, ttl_seconds: int = 21600, max_profiles: int = 10000):
+        self.enabled      = enabled
+        self.ttl_seconds  = ttl_seconds
+        self.max_profiles = max_profiles
+
+        # {id: (referer, user_agent, extra_headers, expires_at)} - baştaki en az kullanılan
+        self._profiles : OrderedDict[str, tuple[str | None, str | None, dict | None, float]] = OrderedDict()
+        self._hits                                                                          = 0
+        self._decoded                                                                       = 0
+        self._invalid                                                                       = 0
+
+    @staticmethod
+    def _canonical(referer: str | None, user_agent: str | None, extra_headers: dict | None) -> bytes:
+        return json.dumps([referer, user_agent, extra_headers], sort_keys=True, separators=(",", ":")).encode()
+
+    @classmethod
+    def make_id(cls, referer: str | None, user_agent: str | None, extra_headers: dict | None) -> str:
+        """Header setinin kısa hash'i - cache anahtarları ve segment URL'leri için"""
+        return urlsafe_b64encode(sha1(cls._canonical(referer, user_agent, extra_headers)).digest()[:9]).decode()
+
+    @classmethod
+    def encode(cls, referer: str | None, user_agent: str | None, extra_headers: dict | None) -> str:
+        return urlsafe_b64encode(zlib.compress(cls._canonical(referer, user_agent, extra_headers), 9)).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, profile_id: str) -> tuple[str | None, str | None, dict | None] | None:
+        try:
+            inflater = zlib.decompressobj()
+            raw      = inflater.decompress(urlsafe_b64decode(profile_id + "=" * (-len(profile_id) % 4)), cls.MAX_DECODED)
+            if inflater.unconsumed_tail or not inflater.eof:
+                return None
+            referer, user_agent, extra_headers = json.loads(raw)
+        except Exception:
+            return None
+
+        if not all(value is None or isinstance(value, str) for value in (referer, user_agent)):
+            return None
+        if extra_headers is not None and not (isinstance(extra_headers, dict) and all(isinstance(k, str) and isinstance(v, str) for k, v in extra_headers.items())):
+            return None
+        return referer, user_agent, extra_headers
+
+    def _remember(self, profile_id: str, profile: tuple[str | None, str | None, dict | None]):
+        self._profiles.pop(profile_id, None)
+        self._profiles[profile_id] = (*profile, monotonic() + self.ttl_seconds)
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def register(self, referer: str | None, user_agent: str | None, extra_headers: dict | None) -> tuple[str, str] | None:
+        """Header setinin (kısa id, çözülebilir id) çifti - kapalıysa ya da set boşsa None"""
+        if not self.enabled or not (referer or user_agent or extra_headers):
+            return None
+
+        profile_id = self.make_id(referer, user_agent, extra_headers)
+        self._remember(profile_id, (referer, user_agent, extra_headers))
+        return profile_id, self.encode(referer, user_agent, extra_headers)
+
+    def get(self, profile_id: str) -> tuple[str | None, str | None, dict | None] | None:
+        """Id'nin header seti - depoda yoksa id'den çözülür, geçersiz / süresi dolmuş kısa id için None"""
+        entry = self._profiles.get(profile_id)
+        now   = monotonic()
+        if entry is not None and now < entry[3]:
+            self._profiles[profile_id] = (*entry[:3], now + self.ttl_seconds)
+            self._profiles.move_to_end(profile_id)
+            self._hits += 1
+            return entry[:3]
+
+        if (profile := self.decode(profile_id)) is None:
+            self._profiles.pop(profile_id, None)
+            self._invalid += 1
+            return None
+
+        self._decoded += 1
+        self._remember(profile_id, profile)
+        return profile
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled"  : self.enabled,
+            "profiles" : len(self._profiles),
+            "hits"     : self._hits,
+            "decoded"  : self._decoded,
+            "invalid"  : self._invalid,
+        }
+
+# Global profil deposu
+header_profiles = HeaderProfileStore(HEADER_PROFILES, HEADER_PROFILE_TTL)
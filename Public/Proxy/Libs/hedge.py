@@ -0,0 +1,143 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict, deque
+from time        import monotonic
+from Settings    import HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_BUDGET, HEDGE_MIN_DELAY_MS
+import asyncio, httpx
+
+class _HostLatency:
+    """Host'un son TTFB örnekleri ve bunlardan hesaplanan hedge eşiği"""
+
+    __slots__ = ("samples", "threshold", "_pending")
+
+    def __init__(self):
+        self.samples   : deque[float] = deque(maxlen=128)
+        self.threshold : float | None = None
+        self._pending                 = 0  # Eşik son hesaplandığından beri gelen örnek
+
+    def add(self, ttfb: float, percentile: float, min_samples: int):
+        self.samples.append(ttfb)
+        self._pending += 1
+        if len(self.samples) >= min_samples and (self.threshold is None or self._pending >= 16):
+            ordered        = sorted(self.samples)
+            self.threshold = ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+            self._pending  = 0
+
+class SegmentHedger:
+    """
+    Hedge'lenmiş upstream istekleri - tek bir yavaş CDN edge'i oynatmayı durdurmasın
+    - Host başına TTFB (yanıt headerlarına kadar geçen süre) yüzdeliği izlenir
+    - İlk istek bu eşiği aşarsa aynı istek ikinci kez atılır; önce gelen kazanır, diğeri iptal
+    - Bütçe: her istek budget kadar hedge hakkı kazandırır, hedge 1 hak harcar;
+      upstream yükü en fazla (1 + budget) katına çıkar
+    """
+
+    MIN_SAMPLES = 20
+    MAX_HOSTS   = 512
+    MAX_TOKENS  = 10.0
+
+    def __init__(self, enabled: bool = False, percentile: float = 95.0, budget: float = 0.1, min_delay: float = 0.05):
+        self.enabled    = enabled
+        self.percentile = percentile
+        self.budget     = budget
+        self.min_delay  = min_delay
+
+        self._hosts   : OrderedDict[str, _HostLatency] = OrderedDict()
+        self._tokens                                   = 0.0
+        self._requests                                 = 0
+        self._hedged                                   = 0
+        self._hedge_wins                               = 0
+        self._denied                                   = 0
+
+    def _latency(self, host: str) -> _HostLatency:
+        latency = self._hosts.get(host)
+        if latency is None:
+            latency           = _HostLatency()
+            self._hosts[host] = latency
+            while len(self._hosts) > self.MAX_HOSTS:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        return latency
+
+    async def send(self, client: httpx.AsyncClient, url: str, headers: dict) -> httpx.Response:
+        """client.send(stream=True) ile aynı - gerekirse hedge'ler"""
+        self._requests += 1
+        self._tokens    = min(self.MAX_TOKENS, self._tokens + self.budget)
+        latency         = self._latency(httpx.URL(url).host)
+        started         = monotonic()
+
+        primary = asyncio.create_task(client.send(client.build_request("GET", url, headers=headers), stream=True))
+        if latency.threshold is None:
+            return await self._finish(primary, latency, started)
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=max(self.min_delay, latency.threshold))
+        except asyncio.CancelledError:
+            primary.cancel()
+            primary.add_done_callback(_discard)
+            raise
+
+        if done:
+            return await self._finish(primary, latency, started)
+
+        if self._tokens < 1:
+            self._denied += 1
+            return await self._finish(primary, latency, started)
+
+        self._tokens -= 1
+        self._hedged += 1
+        hedge         = asyncio.create_task(client.send(client.build_request("GET", url, headers=headers), stream=True))
+        pending       = {primary, hedge}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedge_wins += 1
+                        else:
+                            latency.add(monotonic() - started, self.percentile, self.MIN_SAMPLES)
+                        return task.result()
+
+            # İkisi de hata verdi
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_discard)
+
+    async def _finish(self, task: asyncio.Task, latency: _HostLatency, started: float) -> httpx.Response:
+        try:
+            response = await task
+        except asyncio.CancelledError:
+            task.cancel()
+            task.add_done_callback(_discard)
+            raise
+
+        latency.add(monotonic() - started, self.percentile, self.MIN_SAMPLES)
+        return response
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled"    : self.enabled,
+            "requests"   : self._requests,
+            "hedged"     : self._hedged,
+            "hedge_rate" : round(self._hedged / self._requests, 4) if self._requests else 0.0,
+            "hedge_wins" : self._hedge_wins,
+            "denied"     : self._denied,
+            "thresholds" : {  # ms - son kullanılan 20 host
+                host: round(latency.threshold * 1000, 1)
+                for host, latency in list(reversed(self._hosts.items()))[:20] if latency.threshold is not None
+            },
+        }
+
+def _discard(task: asyncio.Task):
+    """Kaybeden isteğin yanıtı geldiyse bağlantıyı kapat"""
+    if task.cancelled() or task.exception():
+        return
+    asyncio.get_running_loop().create_task(task.result().aclose())
+
+# Global hedger instance
+segment_hedger = SegmentHedger(HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_BUDGET, HEDGE_MIN_DELAY_MS / 1000)
@@ -1,10 +1,14 @@
 # Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
 
-from CLI          import konsol
-from fastapi      import Request
-from urllib.parse import urljoin, quote
-from Settings     import PROXIES
-import httpx, traceback, re, json
+from CLI           import konsol
+from fastapi       import Request, Response
+from urllib.parse  import urljoin, quote
+from functools     import lru_cache
+from email.utils   import parsedate_to_datetime
+from Settings      import PROXIES, POOL_HTTP2, POOL_MAX_CONNECTIONS, POOL_MAX_KEEPALIVE, POOL_KEEPALIVE_EXPIRY, POOL_PER_HOST
+from .pool         import PooledTransport
+from .stream_stats import stream_stats
+import httpx, traceback, re, json, codecs
 
 _proxy_url = PROXIES.get("https") or PROXIES.get("http") if PROXIES else None
 
@@ -19,17 +23,26 @@ def parse_extra_headers(raw: str | None) -> dict[str, str] | None:
         return None
 
 # Global shared AsyncClient for video and subtitle proxying
+# HTTP/2 + havuz limitleri AYAR.yml PROXY bloğundan; host başına istek limiti transport'ta
+shared_transport = PooledTransport(
+    http2            = POOL_HTTP2,
+    max_connections  = POOL_MAX_CONNECTIONS,
+    max_keepalive    = POOL_MAX_KEEPALIVE,
+    keepalive_expiry = POOL_KEEPALIVE_EXPIRY,
+    per_host         = POOL_PER_HOST,
+    pool_timeout     = 10.0,
+    verify           = False,
+    proxy            = _proxy_url,
+)
 shared_client = httpx.AsyncClient(
     follow_redirects = True,
     timeout          = httpx.Timeout(connect=10.0, read=60.0, write=10.0, pool=10.0),
-    verify           = False,
-    proxy            = _proxy_url,
+    transport        = shared_transport,
 )
 
 
 DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_5)"
 DEFAULT_REFERER    = "https://twitter.com/"
-DEFAULT_CHUNK_SIZE = 1024 * 128  # 128KB
 
 CONTENT_TYPES = {
     ".m3u8" : "application/vnd.apple.mpegurl",
@@ -44,6 +57,8 @@ CONTENT_TYPES = {
     ".m4s"  : "video/iso.segment",
 }
 
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
 CORS_HEADERS = {
     "Access-Control-Allow-Origin"  : "*",
     "Access-Control-Allow-Methods" : "GET, HEAD, OPTIONS",
@@ -94,6 +109,11 @@ def prepare_request_headers(request: Request, url: str, referer: str | None, use
     if range_header:
         headers["Range"] = range_header
 
+    # Koşullu GET uçtan uca: cache'te olmayan yanıtlar için upstream 304 dönebilir
+    for header in CONDITIONAL_HEADERS:
+        if value := request.headers.get(header):
+            headers[header.title()] = value
+
     return headers
 
 def prepare_response_headers(response_headers: dict, url: str, detected_content_type: str = None) -> dict:
@@ -106,7 +126,7 @@ def prepare_response_headers(response_headers: dict, url: str, detected_content_
     # Transfer edilecek headerlar
     important_headers = [
         "content-range", "accept-ranges",
-        "etag", "cache-control", "content-disposition",
+        "etag", "last-modified", "cache-control", "content-disposition",
         "content-length"
     ]
 
@@ -120,6 +140,60 @@ def prepare_response_headers(response_headers: dict, url: str, detected_content_
 
     return headers
 
+def get_client_ip(request: Request) -> str:
+    """İstemci IP'si - guvenlik_duvari ile aynı sıra (Cloudflare > X-Forwarded-For > soket)"""
+    fw_for = request.headers.get("X-Forwarded-For")
+    return request.headers.get("Cf-Connecting-Ip") or (fw_for.split(",")[0].strip() if fw_for else (request.client.host if request.client else ""))
+
+def get_validators(headers) -> tuple[str | None, str | None] | None:
+    """Upstream yanıtının (ETag, Last-Modified) doğrulayıcıları - ikisi de yoksa None"""
+    etag          = headers.get("etag")
+    last_modified = headers.get("last-modified")
+    return (etag, last_modified) if etag or last_modified else None
+
+def conditional_headers(validators: tuple[str | None, str | None]) -> dict:
+    """Stale cache entry'sini upstream'de doğrulamak için koşullu istek headerları"""
+    etag, last_modified = validators
+    headers             = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+def strip_conditional(headers: dict) -> dict:
+    """Cache doldurma isteklerinde client'ın koşullu headerları upstream'e gitmemeli"""
+    return {k: v for k, v in headers.items() if k.lower() not in CONDITIONAL_HEADERS}
+
+def is_not_modified(request: Request, etag: str | None, last_modified: str | None) -> bool:
+    """Client'ın koşullu GET'i elimizdeki sürümle eşleşiyor mu (If-None-Match, If-Modified-Since'e önceliklidir)"""
+    if if_none_match := request.headers.get("if-none-match"):
+        if not etag:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        target = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == target for tag in if_none_match.split(","))
+
+    if (since := request.headers.get("if-modified-since")) and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+def not_modified_response(etag: str | None, last_modified: str | None, cache_control: str | None = None) -> Response:
+    """Gövdesiz 304 - doğrulayıcılar ve CORS headerları ile"""
+    headers = CORS_HEADERS.copy()
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
 def detect_hls_from_url(url: str) -> bool:
     """URL yapısından HLS olup olmadığını tahmin eder"""
     url_lower  = url.lower()
@@ -150,13 +224,137 @@ def is_hls_segment(url: str) -> bool:
     segment_indicators = (".ts", ".m4s", ".aac", "seg-", "chunk-", "fragment", ".png", ".jpg", ".jpeg")
     return any(indicator in url_lower for indicator in segment_indicators)
 
-def rewrite_hls_manifest(content: bytes, base_url: str, referer: str = None, user_agent: str = None, force_proxy: bool = False, extra_headers: dict[str, str] | None = None) -> bytes:
+# rewrite_hls_manifest ön-derlenmiş kalıpları
+_EXTM3U_HEAD = re.compile(r"\s*#EXTM3U")
+_URI_ATTR    = re.compile(r'URI="([^"]+)"')
+_URL_UNSAFE  = re.compile(r"[\x00-\x20\x7f#;\[\]]")  # urljoin'in dokunabileceği karakterler - hızlı yol dışı
+
+# Hızlı yola girmeyen URI'ler - live playlist yenilemelerinde / aynı manifest'in farklı header setleriyle
+# rewrite'ında aynı (base, uri) çiftleri tekrar çözülmesin
+_cached_urljoin = lru_cache(maxsize=8192)(urljoin)
+
+class _HlsRewriter:
+    """
+    Tek bir manifest için ön-hesaplanmış rewrite durumu
+    - Proxy query suffix'i (referer, user_agent, force_proxy, extra_headers) bir kez hesaplanır;
+      header_profile (kısa id, çözülebilir id) verilirse header seti yerine sadece &hp=<id> eklenir -
+      media segment'leri kısa id'yi, playlist / key gibi diğer URL'ler çözülebilir id'yi taşır
+    - Göreceli / kök-göreceli / mutlak URI'ler urljoin'e gitmeden çözülür (sonuç birebir aynı),
+      kalanlar LRU cache'li urljoin'e düşer
+    - Satırlar tek tek işlenir; media segment'leri istenirse sırasıyla toplanır
+    """
+
+    __slots__ = ("base_url", "force_proxy", "suffix", "segment_suffix", "dir_prefix", "root_prefix", "scheme_prefix", "segments", "after_extinf", "byterange", "key_line")
+
+    def __init__(self, base_url: str, referer: str = None, user_agent: str = None, force_proxy: bool = False, extra_headers: dict[str, str] | None = None, segments: list[str] | None = None, header_profile: tuple[str, str] | None = None):
+        suffix = ""
+        if not header_profile:
+            if referer:
+                suffix += f'&referer={quote(referer, safe="")}'
+            if user_agent:
+                suffix += f'&user_agent={quote(user_agent, safe="")}'
+        if force_proxy:
+            suffix += "&force_proxy=1"
+        if extra_headers and not header_profile:
+            suffix += f'&extra_headers={quote(json.dumps(extra_headers), safe="")}'
+
+        segment_suffix = suffix
+        if header_profile:
+            segment_suffix = f"&hp={header_profile[0]}" + suffix
+            suffix         = f"&hp={header_profile[1]}" + suffix
+
+        self.base_url       = base_url
+        self.force_proxy    = force_proxy
+        self.suffix         = suffix
+        self.segment_suffix = segment_suffix  # Media segment URL'leri (kısa profil id'si)
+        self.dir_prefix     = urljoin(base_url, "_")[:-1]  # Base'in normalize edilmiş dizini
+        self.root_prefix    = urljoin(base_url, "/_")[:-2]  # Base'in şema + host'u
+        self.scheme_prefix  = base_url.split(":", 1)[0].lower() + "://"
+        self.segments       = segments
+        self.after_extinf   = False  # Sıradaki URL satırı bir media segment'i mi
+        self.byterange      = False  # EXT-X-BYTERANGE segment'leri tek URL'i paylaşır, prefetch'e uygun değil
+        self.key_line       = False  # İşlenen satır EXT-X-KEY mi - key URI'leri &key=1 ile işaretlenir
+
+    def resolve(self, uri: str) -> str:
+        """urljoin(base_url, uri) ile aynı sonuç - emin olunamayan her durumda urljoin'e düşer"""
+        # Başka şemalı mutlak URL: urljoin hiç dokunmadan döner
+        if uri.startswith(("http://", "https://")) and not uri.startswith(self.scheme_prefix):
+            return uri
+
+        if not _URL_UNSAFE.search(uri):
+            path, sep, query = uri.partition("?")
+            if not sep or query:  # Boş query ('?') urljoin'de düşer
+                # Aynı şemalı mutlak URL: urljoin olduğu gibi bırakır (netloc dolu olmalı)
+                if uri.startswith(self.scheme_prefix):
+                    if uri[len(self.scheme_prefix):len(self.scheme_prefix) + 1] not in ("", "/", "?"):
+                        return uri
+                # Nokta/boş segment içermeyen göreceli yol: base dizinine eklenir
+                elif path and ":" not in path and "//" not in path and "/." not in path:
+                    if path[0] not in "/.":
+                        return self.dir_prefix + uri
+                    # Kök-göreceli yol: base'in host'una eklenir
+                    if path[0] == "/":
+                        return self.root_prefix + uri
+
+        return _cached_urljoin(self.base_url, uri)
+
+    def proxy_url(self, absolute_url: str, is_media: bool = False) -> str:
+        return "/proxy/video?url=" + quote(absolute_url, safe="") + (self.segment_suffix if is_media else self.suffix)
+
+    def _replace_uri(self, match: re.Match) -> str:
+        absolute_url = self.resolve(match.group(1))
+
+        # Eğer bir segment DEĞİLSE (key veya alt manifest ise) proxy üzerinden geçmeli
+        # VEYA force_proxy aktif ise her şey proxy üzerinden geçmeli
+        if self.force_proxy or not is_hls_segment(absolute_url):
+            if self.key_line:
+                return 'URI="' + self.proxy_url(absolute_url) + '&key=1"'
+            return 'URI="' + self.proxy_url(absolute_url) + '"'
+
+        # Segment ise doğrudan CDN
+        return 'URI="' + absolute_url + '"'
+
+    def rewrite_line(self, line: str) -> str:
+        stripped = line.strip()
+
+        if stripped.startswith("#EXTINF"):
+            self.after_extinf = True
+        elif stripped.startswith("#EXT-X-BYTERANGE"):
+            self.byterange = True
+
+        # URI="..." içeren satırları işle (audio/subtitle tracks, encryption keys)
+        if 'URI="' in line:
+            self.key_line = stripped.startswith(("#EXT-X-KEY", "#EXT-X-SESSION-KEY"))
+            return _URI_ATTR.sub(self._replace_uri, line)
+
+        # URL satırları (# ile başlamayan ve boş olmayan)
+        if stripped and stripped[0] != "#":
+            absolute_url = self.resolve(stripped)
+
+            is_media = self.after_extinf
+            if self.segments is not None and is_media and not self.byterange:
+                self.segments.append(absolute_url)
+            self.after_extinf = self.byterange = False
+
+            # Segment ise doğrudan CDN (Bant Genişliği Tasarrufu)
+            if not self.force_proxy and is_hls_segment(absolute_url):
+                return absolute_url
+
+            # Alt manifest (.m3u8) veya force_proxy=true ise proxy
+            return self.proxy_url(absolute_url, is_media)
+
+        return line
+
+def rewrite_hls_manifest(content: bytes, base_url: str, referer: str = None, user_agent: str = None, force_proxy: bool = False, extra_headers: dict[str, str] | None = None, segments: list[str] | None = None, header_profile: tuple[str, str] | None = None) -> bytes:
     """
     HLS manifest içindeki göreceli URL'leri işler.
 
     BANT GENİŞLİĞİ OPTİMİZASYONU:
     - Manifest dosyaları (.m3u8) -> Proxy üzerinden (CORS + header injection için)
     - Video segmentleri (.ts, .m4s) -> Doğrudan CDN'den (bant genişliği tasarrufu)
+
+    segments verilirse media playlist'teki segment URL'leri (mutlak, sırasıyla) bu listeye eklenir.
+    header_profile (kısa id, çözülebilir id) verilirse proxy URL'leri referer/user_agent/extra_headers yerine &hp=<id> taşır.
     """
     try:
         text = content.decode('utf-8')
@@ -164,120 +362,274 @@ def rewrite_hls_manifest(content: bytes, base_url: str, referer: str = None, use
         return content  # Binary içerik, değiştirme
 
     # HLS manifest değilse değiştirme
-    if not text.strip().startswith('#EXTM3U'):
+    if not _EXTM3U_HEAD.match(text):
         return content
 
-    lines           = text.split('\n')
-    new_lines       = []
-    extra_headers_q = f'&extra_headers={quote(json.dumps(extra_headers), safe="")}' if extra_headers else ''
+    rewriter = _HlsRewriter(base_url, referer, user_agent, force_proxy, extra_headers, segments, header_profile)
+    return '\n'.join(map(rewriter.rewrite_line, text.split('\n'))).encode('utf-8')
 
-    for line in lines:
-        stripped = line.strip()
+_SNIFF_LIMIT = 4 * 1024     # #EXTM3U aranırken baştaki boşluk için en fazla bekletilecek byte
+_LINE_LIMIT  = 1024 * 1024  # Tek satır bundan uzunsa rewrite bırakılır, kalanı olduğu gibi akar
 
-        # URI="..." içeren satırları işle (audio/subtitle tracks, encryption keys)
-        if 'URI="' in line:
-            def replace_uri(match):
-                uri          = match.group(1)
-                absolute_url = urljoin(base_url, uri)
-
-                # Eğer bir segment DEĞİLSE (key veya alt manifest ise) proxy üzerinden geçmeli
-                # VEYA force_proxy aktif ise her şey proxy üzerinden geçmeli
-                if force_proxy or not is_hls_segment(absolute_url):
-                    proxy_url = f'/proxy/video?url={quote(absolute_url, safe="")}'
-                    if referer:
-                        proxy_url += f'&referer={quote(referer, safe="")}'
-                    if user_agent:
-                        proxy_url += f'&user_agent={quote(user_agent, safe="")}'
-                    if force_proxy:
-                        proxy_url += '&force_proxy=1'
-                    proxy_url += extra_headers_q
-                    return f'URI="{proxy_url}"'
-
-                # Segment ise doğrudan CDN
-                return f'URI="{absolute_url}"'
-
-            line = re.sub(r'URI="([^"]+)"', replace_uri, line)
-            new_lines.append(line)
-
-        # URL satırları (# ile başlamayan ve boş olmayan)
-        elif stripped and not stripped.startswith('#'):
-            absolute_url = urljoin(base_url, stripped)
+def _rewrite_lines(rewriter: _HlsRewriter, block: bytes) -> bytes:
+    """Tam satırlardan oluşan bloğu rewrite eder - UTF-8 olmayan satırlar olduğu gibi kalır"""
+    try:
+        return '\n'.join(map(rewriter.rewrite_line, block.decode('utf-8').split('\n'))).encode('utf-8')
+    except UnicodeDecodeError:
+        pass
 
-            # Segment ise doğrudan CDN (Bant Genişliği Tasarrufu)
-            if not force_proxy and is_hls_segment(absolute_url):
-                new_lines.append(absolute_url)
-            else:
-                # Alt manifest (.m3u8) veya force_proxy=true ise proxy
-                proxy_url = f'/proxy/video?url={quote(absolute_url, safe="")}'
-                if referer:
-                    proxy_url += f'&referer={quote(referer, safe="")}'
-                if user_agent:
-                    proxy_url += f'&user_agent={quote(user_agent, safe="")}'
-                if force_proxy:
-                    proxy_url += '&force_proxy=1'
-                proxy_url += extra_headers_q
-                new_lines.append(proxy_url)
+    lines = []
+    for line in block.split(b'\n'):
+        try:
+            lines.append(rewriter.rewrite_line(line.decode('utf-8')).encode('utf-8'))
+        except UnicodeDecodeError:
+            lines.append(line)
+    return b'\n'.join(lines)
 
-        else:
-            new_lines.append(line)
+async def stream_hls_manifest(response: httpx.Response, base_url: str, referer: str = None, user_agent: str = None, force_proxy: bool = False, extra_headers: dict[str, str] | None = None, segments: list[str] | None = None, header_profile: tuple[str, str] | None = None, tee=None, sink=None):
+    """
+    rewrite_hls_manifest'in akan sürümü - gövde beklenmeden satır satır rewrite edilip yield edilir
 
-    return '\n'.join(new_lines).encode('utf-8')
+    - Bellekte sadece yarım kalan son satır tutulur; UTF-8 geçerli playlist'te çıktı birebir aynıdır
+    - Gövde #EXTM3U ile başlamıyorsa olduğu gibi akar; UTF-8 olmayan satırlar dokunulmadan geçer
+    - tee upstream gövdesinin, sink rewrite sonucunun kopyasını biriktirir (upstream.TeeSink);
+      eksiksiz biten akışta commit edilir
+    """
+    meter   = stream_stats.open(str(response.request.url), "hls")
+    rewrite = None   # None: #EXTM3U kararı henüz verilmedi
+    pending = b""    # Karar öncesi baş kısım / yarım kalan son satır
+    chunks  = response.aiter_bytes()
+    handoff = False  # Client koptu, kalan gövde tee'yi bekleyenler için arka planda okunuyor
 
-async def stream_wrapper(response: httpx.Response):
-    """Response içeriğini yield eder ve bağlantıyı güvenle kapatır"""
     try:
-        async for chunk in response.aiter_bytes(chunk_size=DEFAULT_CHUNK_SIZE):
+        rewriter = _HlsRewriter(base_url, referer, user_agent, force_proxy, extra_headers, segments, header_profile)
+
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if tee:
+                tee.feed(chunk)
+
+            if rewrite is None:
+                pending += chunk
+                head     = pending.lstrip()
+                if len(head) < 7 and len(pending) < _SNIFF_LIMIT:
+                    continue
+                rewrite, chunk, pending = head.startswith(b"#EXTM3U"), pending, b""
+
+            if rewrite:
+                block = pending + chunk
+                cut   = block.rfind(b"\n")
+                if cut < 0:
+                    pending = block
+                    if len(pending) <= _LINE_LIMIT:
+                        continue
+                    rewrite, chunk, pending = False, pending, b""  # Satır değil - olduğu gibi bırak
+                else:
+                    pending = block[cut + 1:]
+                    chunk   = _rewrite_lines(rewriter, block[:cut]) + b"\n"
+
+            if sink:
+                sink.feed(chunk)
             yield chunk
+            meter.sent(len(chunk))
+
+        # Son satır (sondaki boş satır da rewrite'tan aynen döner) ya da kararsız kalan kısa gövde
+        if rewrite is None:
+            rewrite = pending.lstrip().startswith(b"#EXTM3U")
+        tail = _rewrite_lines(rewriter, pending) if rewrite else pending
+        if tail:
+            if sink:
+                sink.feed(tail)
+            yield tail
+            meter.sent(len(tail))
+
+        if tee:
+            await tee.finish()
+        if sink:
+            await sink.finish()
     except GeneratorExit:
+        handoff = bool(tee) and tee.handoff(chunks, response)
+    except Exception as e:
+        konsol.print(f"[red]Manifest stream hatası: {str(e)}[/red]")
+    except BaseException:
         pass
+    finally:
+        stream_stats.close(meter)
+        if sink:
+            sink.abort()
+        if not handoff:
+            if tee:
+                tee.abort()
+            await response.aclose()
+
+async def stream_wrapper(response: httpx.Response, tee=None):
+    """
+    Response içeriğini yield eder ve bağlantıyı güvenle kapatır
+
+    Gövde sıkıştırılmamışsa (identity) aiter_raw ile decode/rechunk katmanı atlanır ve upstream
+    buffer'ları kopyalanmadan iletilir; batch hedefinden küçük buffer'lar birleştirilerek gönderilir.
+
+    tee verilirse (upstream.TeeSink) her chunk client'a gönderilirken kopyası biriktirilir;
+    gövde eksiksiz biterse commit edilir, yarıda kalırsa atılır. Client koparsa ve tee'yi
+    bekleyenler varsa kalan gövde onlar için arka planda okunur.
+    """
+    raw          = response.headers.get("content-encoding", "identity").strip().lower() in ("", "identity")
+    meter        = stream_stats.open(str(response.request.url), "raw" if raw else "decoded")
+    pending      = []
+    pending_size = 0
+    chunks       = response.aiter_raw() if raw else response.aiter_bytes()
+    handoff      = False
+
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if tee:
+                tee.feed(chunk)
+
+            # İlk chunk (TTFB) ve hedeften büyük buffer'lar olduğu gibi gider
+            if not pending and (not meter.sends or len(chunk) >= meter.batch_target):
+                yield chunk
+                meter.sent(len(chunk))
+                continue
+
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= meter.batch_target:
+                piece        = b"".join(pending)
+                pending      = []
+                pending_size = 0
+                yield piece
+                meter.sent(len(piece))
+
+        if pending:
+            piece   = b"".join(pending)
+            pending = []
+            yield piece
+            meter.sent(len(piece))
+
+        if tee:
+            await tee.finish()
+    except GeneratorExit:
+        handoff = bool(tee) and tee.handoff(chunks, response)
     except Exception as e:
         konsol.print(f"[red]Stream hatası: {str(e)}[/red]")
     except BaseException:
         pass
     finally:
-        await response.aclose()
+        stream_stats.close(meter)
+        if not handoff:
+            if tee:
+                tee.abort()
+            await response.aclose()
 
-def process_subtitle_content(content: bytes, content_type: str, url: str) -> bytes:
-    """Altyazı içeriğini işler ve VTT formatına çevirir"""
-    def _normalize_vtt_timestamps(text: str) -> str:
-        # Only replace comma in timestamps (HH:MM:SS,mmm -> HH:MM:SS.mmm)
-        return re.sub(r"(\d{2}:\d{2}:\d{2}),(\d{3})", r"\1.\2", text)
+_SUB_TIMESTAMP = re.compile(r"(\d{2}:\d{2}:\d{2}),(\d{3})")
 
-    # 1. UTF-8 BOM temizliği
-    if content.startswith(b"\xef\xbb\xbf"):
-        content = content[3:]
+class SubtitleConverter:
+    """
+    Artımlı altyazı -> VTT dönüştürücü, upstream chunk'ları geldikçe işler
+    - Format (VTT / SRT / dokunulmayan) ilk byte'lardan belirlenir; karar verilemeyen baş kısım beklenir
+    - Timestamp virgülü tamamlanmış satırlarda düzeltilir, yarım satır bir sonraki chunk'a taşınır
+    - feed(...) + finish() çıktısı gövdenin tamamıyla yapılan dönüşümle birebir aynıdır
+    """
 
-    # 2. VTT Kontrolü
-    is_vtt = "text/vtt" in content_type or content.startswith(b"WEBVTT")
-    if is_vtt:
-        try:
-            text = content.decode("utf-8", errors="ignore")
-            text = _normalize_vtt_timestamps(text)
+    __slots__ = ("content_type", "url", "mode", "_head", "_decoder", "_carry", "_cr", "_started")
+
+    def __init__(self, content_type: str, url: str):
+        self.content_type = content_type or ""
+        self.url          = url
+        self.mode         = None   # vtt | srt | raw
+        self._head        = b""    # Format belirlenene kadar biriken baş kısım
+        self._decoder     = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._carry       = ""     # Henüz tamamlanmamış satır
+        self._cr          = False  # SRT: chunk '\r' ile bitti, sonraki chunk'ın '\n'i ile birleşebilir
+        self._started     = False  # WEBVTT başlığı kontrol edildi mi
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self.mode is None:
+            self._head += chunk
+            if not self._decide(final=False):
+                return b""
+            chunk, self._head = self._head, b""
+
+        return self._convert(chunk, final=False)
+
+    def finish(self) -> bytes:
+        chunk = b""
+        if self.mode is None:
+            self._decide(final=True)
+            chunk, self._head = self._head, b""
+
+        return self._convert(chunk, final=True)
+
+    def _decide(self, final: bool) -> bool:
+        head = self._head
+
+        # 1. UTF-8 BOM temizliği
+        if not final and len(head) < 3 and b"\xef\xbb\xbf".startswith(head):
+            return False
+        if head.startswith(b"\xef\xbb\xbf"):
+            head = head[3:]
+
+        # 2. VTT Kontrolü
+        if "text/vtt" in self.content_type or head.startswith(b"WEBVTT"):
+            mode = "vtt"
+        elif not final and len(head) < 6 and b"WEBVTT".startswith(head):
+            return False
+
+        # 3. SRT Kontrolü - içerik '1' numaralı cue ile başlıyor mu (baş/son boşluklar hariç)
+        elif self.content_type == "application/x-subrip" or self.url.endswith(".srt"):
+            mode = "srt"
+        elif final:
+            body = head.strip()
+            mode = "srt" if body.startswith((b"1\r\n", b"1\n")) else "raw"
+        else:
+            body = head.lstrip()
+            mode = "raw"
+            for prefix in (b"1\r\n", b"1\n"):
+                if body.startswith(prefix):
+                    # Arkasından gerçek içerik gelmeli, aksi halde sondaki boşluk strip'e gider
+                    if not body[len(prefix):].strip():
+                        return False
+                    mode = "srt"
+                    break
+                if prefix.startswith(body):
+                    return False
+
+        self.mode  = mode
+        self._head = head
+        return True
+
+    def _convert(self, chunk: bytes, final: bool) -> bytes:
+        if self.mode == "raw":
+            return chunk
+
+        if self.mode == "srt":
+            if self._cr:
+                chunk, self._cr = b"\r" + chunk, False
+            if not final and chunk.endswith(b"\r"):
+                chunk, self._cr = chunk[:-1], True
+            chunk = chunk.replace(b"\r\n", b"\n")
+
+        text = self._carry + self._decoder.decode(chunk, final)
+        if final:
+            self._carry = ""
+        else:
+            cut               = text.rfind("\n") + 1
+            text, self._carry = text[:cut], text[cut:]
+            if not text:
+                return b""
+
+        text = _SUB_TIMESTAMP.sub(r"\1.\2", text)  # Sadece timestamp virgülü
+        if not self._started:
+            self._started = True
             if not text.startswith("WEBVTT"):
                 text = "WEBVTT\n\n" + text
-            return text.encode("utf-8")
-        except Exception:
-            if not content.startswith(b"WEBVTT"):
-                return b"WEBVTT\n\n" + content
-            return content
-
-    # 3. SRT -> VTT Dönüşümü
-    is_srt = (
-        content_type == "application/x-subrip" or
-        url.endswith(".srt") or
-        content.strip().startswith(b"1\r\n") or
-        content.strip().startswith(b"1\n")
-    )
 
-    if is_srt:
-        try:
-            content = content.replace(b"\r\n", b"\n")
-            text    = content.decode("utf-8", errors="ignore")
-            text    = re.sub(r'(\d{2}:\d{2}:\d{2}),(\d{3})', r'\1.\2', text)  # Sadece timestamp virgülü
-            if not text.startswith("WEBVTT"):
-                text = "WEBVTT\n\n" + text
-            return text.encode("utf-8")
-        except Exception as e:
-            konsol.print(f"[yellow]SRT dönüştürme hatası: {str(e)}[/yellow]")
+        return text.encode("utf-8")
 
-    return content
+def process_subtitle_content(content: bytes, content_type: str, url: str) -> bytes:
+    """Altyazı içeriğini işler ve VTT formatına çevirir"""
+    converter = SubtitleConverter(content_type, url)
+    return converter.feed(content) + converter.finish()
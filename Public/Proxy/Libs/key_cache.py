@@ -0,0 +1,64 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+from time        import monotonic
+from Settings    import KEY_CACHE_TTL, KEY_CACHE_MB
+
+class KeyCache:
+    """
+    EXT-X-KEY şifre çözme anahtarları için küçük cache
+    - Anahtar: mutlak key URL'i + upstream header parmak izi (upstream.coalesce_key)
+    - Aynı key'i paylaşan segment'ler arasında her sınırda upstream'e gidilmez
+    - Uçuştaki aynı istekler fetch_shared ile tek isteğe iner
+    - Adet ve toplam boyut limiti aşılınca en az kullanılan (LRU) anahtarlar silinir
+    """
+
+    def __init__(self, max_items: int = 1024, ttl_seconds: int = 300, max_size_mb: int = 4):
+        self.max_items      = max_items
+        self.ttl_seconds    = ttl_seconds
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+
+        # {key: (content, content_type, expires_at)} - baştaki en az kullanılan
+        self._cache      : OrderedDict[str, tuple[bytes, str, float]] = OrderedDict()
+        self._total_size                                              = 0
+        self._hits                                                    = 0
+        self._misses                                                  = 0
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        entry = self._cache.get(key)
+        if entry is None or monotonic() >= entry[2]:
+            self._remove(key)
+            self._misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return entry[0], entry[1]
+
+    def set(self, key: str, content: bytes, content_type: str):
+        size = len(content)
+        if size > self.max_size_bytes:
+            return
+
+        self._remove(key)
+        self._cache[key]  = (content, content_type, monotonic() + self.ttl_seconds)
+        self._total_size += size
+        while len(self._cache) > self.max_items or self._total_size > self.max_size_bytes:
+            self._remove(next(iter(self._cache)))
+
+    def _remove(self, key: str):
+        if entry := self._cache.pop(key, None):
+            self._total_size -= len(entry[0])
+
+    def get_stats(self) -> dict:
+        return {
+            "total_items"   : len(self._cache),
+            "total_size_kb" : round(self._total_size / 1024, 2),
+            "max_size_mb"   : round(self.max_size_bytes / (1024 * 1024), 2),
+            "ttl_seconds"   : self.ttl_seconds,
+            "hits"          : self._hits,
+            "misses"        : self._misses,
+        }
+
+# Global cache instance
+key_cache = KeyCache(ttl_seconds=KEY_CACHE_TTL, max_size_mb=KEY_CACHE_MB)
@@ -0,0 +1,110 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+from time        import monotonic
+from Settings    import MANIFEST_CACHE_MB, MANIFEST_VOD_TTL, MANIFEST_LIVE_TTL_RATIO
+import re
+
+_TARGET_DURATION = re.compile(rb"#EXT-X-TARGETDURATION:\s*(\d+(?:\.\d+)?)")
+
+class ManifestCache:
+    """
+    Rewrite edilmiş HLS playlist cache'i
+    - VOD (#EXT-X-ENDLIST) ve master playlist'ler uzun TTL ile tutulur
+    - Live playlist'ler EXT-X-TARGETDURATION'ın bir kesri kadar tutulur, aynı playlist'i
+      yoklayan izleyiciler yenileme penceresi başına tek upstream isteğine iner
+    - Boyut limiti aşılınca en az kullanılan (LRU) playlist'ler silinir
+    - Süresi dolan ama upstream ETag/Last-Modified'ı olan playlist'ler stale olarak kalır;
+      koşullu istek 304 dönerse aynı içerik yeniden rewrite edilmeden tazelenir
+    """
+
+    LIVE_DEFAULT_TTL = 2.0  # TARGETDURATION okunamazsa
+
+    def __init__(self, max_size_mb: int = 16, vod_ttl_seconds: int = 3600, live_ttl_ratio: float = 0.5):
+        self.max_size_bytes  = max_size_mb * 1024 * 1024
+        self.vod_ttl_seconds = vod_ttl_seconds
+        self.live_ttl_ratio  = live_ttl_ratio
+
+        # {key: (content, headers, expires_at, size, validators, ttl)} - baştaki en az kullanılan
+        self._cache      : OrderedDict[str, tuple[bytes, dict, float, int, tuple | None, float]] = OrderedDict()
+        self._total_size                                                                         = 0
+        self._hits                                                                               = 0
+        self._misses                                                                             = 0
+        self._revalidated                                                                        = 0
+
+    @staticmethod
+    def make_key(url: str, *parts) -> str:
+        """Rewrite sonucunu etkileyen her şey (referer, UA, extra_headers, force_proxy...) anahtara girer"""
+        return "|".join((url, *(str(part) if part is not None else "" for part in parts)))
+
+    def ttl_for(self, original: bytes) -> float:
+        """Upstream playlist içeriğine göre TTL"""
+        if b"#EXT-X-ENDLIST" in original or b"#EXT-X-STREAM-INF" in original:
+            return self.vod_ttl_seconds
+
+        if match := _TARGET_DURATION.search(original):
+            return max(1.0, float(match.group(1)) * self.live_ttl_ratio)
+
+        return self.LIVE_DEFAULT_TTL
+
+    def get(self, key: str) -> tuple[bytes, dict] | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        content, headers, expires_at, _, validators, _ = entry
+        if monotonic() >= expires_at:
+            if not validators:
+                self._remove(key)  # Doğrulanamaz - stale tutmanın anlamı yok
+            self._misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return content, headers
+
+    def get_stale(self, key: str) -> tuple[bytes, dict, tuple[str | None, str | None]] | None:
+        """Süresi dolmuş, upstream'de koşullu istekle doğrulanabilecek playlist"""
+        entry = self._cache.get(key)
+        if entry is None or not entry[4] or monotonic() < entry[2]:
+            return None
+        return entry[0], entry[1], entry[4]
+
+    def refresh(self, key: str):
+        """Upstream 304 döndü - stale entry'yi kendi TTL'i kadar tazele"""
+        if (entry := self._cache.get(key)) is None:
+            return
+
+        self._cache[key] = (entry[0], entry[1], monotonic() + entry[5], entry[3], entry[4], entry[5])
+        self._cache.move_to_end(key)
+        self._revalidated += 1
+
+    def set(self, key: str, content: bytes, headers: dict, ttl: float, validators: tuple[str | None, str | None] | None = None):
+        size = len(content)
+        if size > self.max_size_bytes:
+            return
+
+        self._remove(key)
+        self._cache[key]  = (content, headers, monotonic() + ttl, size, validators, ttl)
+        self._total_size += size
+
+        while self._total_size > self.max_size_bytes and self._cache:
+            self._remove(next(iter(self._cache)))
+
+    def _remove(self, key: str):
+        if entry := self._cache.pop(key, None):
+            self._total_size -= entry[3]
+
+    def get_stats(self) -> dict:
+        return {
+            "total_items"   : len(self._cache),
+            "total_size_mb" : round(self._total_size / (1024 * 1024), 2),
+            "max_size_mb"   : round(self.max_size_bytes / (1024 * 1024), 2),
+            "hits"          : self._hits,
+            "misses"        : self._misses,
+            "revalidated"   : self._revalidated,
+        }
+
+# Global cache instance
+manifest_cache = ManifestCache(MANIFEST_CACHE_MB, MANIFEST_VOD_TTL, MANIFEST_LIVE_TTL_RATIO)
@@ -0,0 +1,108 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import deque
+from Settings    import MEMORY_BUDGET_MB, MEMORY_QUEUE_TIMEOUT
+import asyncio
+
+class ByteBudget:
+    """
+    Süreç geneli byte bütçesi (ağırlıklı semaphore) - belleğe okunan upstream gövdeleri için
+    - try_acquire: beklemeden; alınamazsa çağıran stream'e düşer
+    - acquire: FIFO kuyrukta en fazla timeout kadar bekler (gövdesi şart olan manifest'ler)
+    - Bütçeden büyük tekil istek, bütçe tamamen boşken kabul edilir (sonsuza dek beklemesin)
+    """
+
+    def __init__(self, max_bytes: int, queue_timeout: float = 5.0):
+        self.max_bytes     = max_bytes
+        self.queue_timeout = queue_timeout
+
+        self._in_use  = 0
+        self._peak    = 0
+        self._waiters : deque[tuple[int, asyncio.Future]] = deque()
+
+        self._granted  = 0
+        self._denied   = 0  # Beklemeden alınamadı - stream'e düşüldü
+        self._queued   = 0
+        self._timeouts = 0
+
+    def _fits(self, size: int) -> bool:
+        return self._in_use + size <= self.max_bytes or self._in_use == 0
+
+    def _take(self, size: int):
+        self._in_use  += size
+        self._peak     = max(self._peak, self._in_use)
+        self._granted += 1
+
+    def try_acquire(self, size: int) -> bool:
+        # Kuyrukta bekleyen varken öne geçme
+        if self._waiters or not self._fits(size):
+            self._denied += 1
+            return False
+
+        self._take(size)
+        return True
+
+    async def acquire(self, size: int, timeout: float | None = None) -> bool:
+        if not self._waiters and self._fits(size):
+            self._take(size)
+            return True
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        if timeout <= 0:
+            self._denied += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        entry  = (size, future)
+        self._waiters.append(entry)
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                self.release(size)  # Tam zaman aşımı anında verilmiş - geri bırak
+            else:
+                future.cancel()
+                self._waiters.remove(entry)
+                self._wake()
+
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._timeouts += 1
+            return False
+
+    def resize(self, reserved: int, actual: int):
+        """Boyutu tahminle ayrılmış rezervasyonu gerçek boyuta çeker (fazlası zorla eklenir)"""
+        self._in_use += actual - reserved
+        self._peak    = max(self._peak, self._in_use)
+        if actual < reserved:
+            self._wake()
+
+    def release(self, size: int):
+        self._in_use -= size
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._fits(self._waiters[0][0]):
+            size, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._take(size)
+            future.set_result(True)
+
+    def get_stats(self) -> dict:
+        return {
+            "max_mb"    : round(self.max_bytes / (1024 * 1024), 2),
+            "in_use_mb" : round(self._in_use / (1024 * 1024), 2),
+            "peak_mb"   : round(self._peak / (1024 * 1024), 2),
+            "waiting"   : len(self._waiters),
+            "granted"   : self._granted,
+            "denied"    : self._denied,
+            "queued"    : self._queued,
+            "timeouts"  : self._timeouts,
+        }
+
+# Global bütçe
+memory_budget = ByteBudget(MEMORY_BUDGET_MB * 1024 * 1024, MEMORY_QUEUE_TIMEOUT)
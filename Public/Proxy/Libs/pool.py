@@ -0,0 +1,188 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+from time        import monotonic
+import asyncio, httpx
+
+class _HostGate:
+    """Tek bir upstream host'unun eşzamanlılık kapısı ve bekleme istatistikleri"""
+
+    __slots__ = ("semaphore", "in_flight", "streaming", "waiting", "requests", "waited", "wait_total", "wait_max", "pool_waiting", "pool_wait_total", "pool_wait_max")
+
+    def __init__(self, limit: int):
+        self.semaphore       = asyncio.Semaphore(limit) if limit > 0 else None
+        self.in_flight       = 0    # Bağlantı kurulumu / header bekleyen istekler (slot tutar)
+        self.streaming       = 0    # Gövdesi hala okunan yanıtlar (slot tutmaz)
+        self.waiting         = 0
+        self.requests        = 0
+        self.waited          = 0    # Slot için beklemek zorunda kalan istek sayısı
+        self.wait_total      = 0.0
+        self.wait_max        = 0.0
+        self.pool_waiting    = 0    # httpcore havuzunda bağlantı atanmasını bekleyen istekler
+        self.pool_wait_total = 0.0  # Havuz kuyruğunda geçen süre (bağlantı atanana kadar)
+        self.pool_wait_max   = 0.0
+
+class _CountedStream(httpx.AsyncByteStream):
+    """Yanıt gövdesi kapanınca host'un açık stream sayacını düşürür"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream  = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release:
+                self._release()
+                self._release = None
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    shared_client transport'u - HTTP/2 + ayarlanabilir bağlantı havuzu
+    - httpx.Limits ile toplam / keep-alive bağlantı sayısı ve keep-alive süresi
+    - Host başına eşzamanlı istek limiti: sadece bağlantı kurulumu ve header bekleme süresini
+      kapsar - tek bir CDN'e aynı anda yığılan istekler sıraya girer, ama uzun süren MP4 / segment
+      gövdeleri slot tutmaz, izleyici sayısı sınırlanmaz
+    - httpcore havuz kuyruğunda bağlantı bekleme süresi (istek -> ilk bağlantı olayı) trace extension'ı
+      ile ölçülür; slot / havuz bekleme süreleri ve havuz doluluğu get_stats ile görülebilir
+    """
+
+    MAX_TRACKED_HOSTS = 512
+
+    def __init__(self, http2: bool = True, max_connections: int = 200, max_keepalive: int = 50, keepalive_expiry: float = 30.0, per_host: int = 0, pool_timeout: float = 10.0, **transport_kwargs):
+        self.http2        = http2
+        self.limits       = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive, keepalive_expiry=keepalive_expiry)
+        self.per_host     = per_host
+        self.pool_timeout = pool_timeout
+
+        self._transport = httpx.AsyncHTTPTransport(http2=http2, limits=self.limits, **transport_kwargs)
+        self._hosts     : OrderedDict[str, _HostGate] = OrderedDict()
+
+    def _gate(self, host: str) -> _HostGate:
+        gate = self._hosts.get(host)
+        if gate is None:
+            gate              = _HostGate(self.per_host)
+            self._hosts[host] = gate
+            # Eski, boştaki host'ları unut - açık istekleri olanlara dokunma
+            if len(self._hosts) > self.MAX_TRACKED_HOSTS:
+                for old in [old for old, g in self._hosts.items() if not g.in_flight and not g.streaming and not g.waiting][:len(self._hosts) - self.MAX_TRACKED_HOSTS]:
+                    del self._hosts[old]
+        else:
+            self._hosts.move_to_end(host)
+        return gate
+
+    async def _acquire(self, gate: _HostGate):
+        if gate.semaphore is None:
+            return
+
+        if gate.semaphore.locked():
+            gate.waiting += 1
+            gate.waited  += 1
+            start         = monotonic()
+            try:
+                await asyncio.wait_for(gate.semaphore.acquire(), self.pool_timeout)
+            except asyncio.TimeoutError:
+                raise httpx.PoolTimeout("Host bağlantı limiti için bekleme zaman aşımı") from None
+            finally:
+                gate.waiting    -= 1
+                waited           = monotonic() - start
+                gate.wait_total += waited
+                gate.wait_max    = max(gate.wait_max, waited)
+        else:
+            await gate.semaphore.acquire()
+
+    def _trace_pool_wait(self, request: httpx.Request, gate: _HostGate):
+        """httpcore'un ilk trace olayı (connect_tcp / send_request_headers) isteğe bağlantı atandığını gösterir"""
+        started  = monotonic()
+        previous = request.extensions.get("trace")
+        gate.pool_waiting += 1
+
+        def assigned():
+            nonlocal started
+            if started is None:
+                return
+            waited                = monotonic() - started
+            started               = None
+            gate.pool_waiting    -= 1
+            gate.pool_wait_total += waited
+            gate.pool_wait_max    = max(gate.pool_wait_max, waited)
+
+        async def trace(event_name: str, info: dict):
+            assigned()
+            if previous:
+                await previous(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        return assigned
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        gate = self._gate(request.url.host)
+        await self._acquire(gate)
+        gate.in_flight += 1
+        gate.requests  += 1
+        assigned        = self._trace_pool_wait(request, gate)
+
+        # Slot header'lar gelince bırakılır - gövde okunurken başka isteklerin önünü kesmez
+        try:
+            response = await self._transport.handle_async_request(request)
+        finally:
+            assigned()  # Havuz zaman aşımı / hata - bekleme bitti
+            gate.in_flight -= 1
+            if gate.semaphore is not None:
+                gate.semaphore.release()
+
+        gate.streaming += 1
+
+        def release():
+            gate.streaming -= 1
+
+        response.stream = _CountedStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def get_stats(self) -> dict:
+        # Anlık bağlantı listesi httpcore'un iç detayı - sürüm değişirse sadece bu sayaçlar boş kalır
+        connections = list(getattr(getattr(self._transport, "_pool", None), "connections", None) or [])
+        idle        = sum(1 for conn in connections if conn.is_idle())
+        http2       = sum(1 for conn in connections if "HTTP/2" in conn.info())
+        busiest     = sorted(self._hosts.items(), key=lambda item: (item[1].in_flight + item[1].streaming + item[1].waiting + item[1].pool_waiting, item[1].requests), reverse=True)[:20]
+        requests    = sum(gate.requests for gate in self._hosts.values())
+
+        return {
+            "http2"             : self.http2,
+            "max_connections"   : self.limits.max_connections,
+            "max_keepalive"     : self.limits.max_keepalive_connections,
+            "per_host"          : self.per_host,
+            "connections"       : len(connections),
+            "active"            : len(connections) - idle,
+            "idle"              : idle,
+            "http2_connections" : http2,
+            "in_flight"         : sum(gate.in_flight for gate in self._hosts.values()),
+            "streaming"         : sum(gate.streaming for gate in self._hosts.values()),
+            "waiting"           : sum(gate.waiting for gate in self._hosts.values()),
+            "pool_waiting"      : sum(gate.pool_waiting for gate in self._hosts.values()),
+            "avg_pool_wait_ms"  : round(sum(gate.pool_wait_total for gate in self._hosts.values()) / requests * 1000, 2) if requests else 0.0,
+            "max_pool_wait_ms"  : round(max((gate.pool_wait_max for gate in self._hosts.values()), default=0.0) * 1000, 2),
+            "hosts"             : {
+                host: {
+                    "in_flight"        : gate.in_flight,
+                    "streaming"        : gate.streaming,
+                    "waiting"          : gate.waiting,
+                    "pool_waiting"     : gate.pool_waiting,
+                    "requests"         : gate.requests,
+                    "waited"           : gate.waited,
+                    "avg_wait_ms"      : round(gate.wait_total / gate.waited * 1000, 2) if gate.waited else 0.0,
+                    "max_wait_ms"      : round(gate.wait_max * 1000, 2),
+                    "avg_pool_wait_ms" : round(gate.pool_wait_total / gate.requests * 1000, 2) if gate.requests else 0.0,
+                    "max_pool_wait_ms" : round(gate.pool_wait_max * 1000, 2),
+                }
+                for host, gate in busiest
+            },
+        }
@@ -0,0 +1,212 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections    import OrderedDict
+from time           import monotonic
+from Settings       import PREFETCH_SEGMENTS, PREFETCH_CONCURRENCY, PREFETCH_IDLE
+from .segment_cache import segment_cache
+from .upstream      import fetch_shared, coalesce_key, UpstreamBody, SEGMENT_BODY_LIMIT
+from .helpers       import get_validators, strip_conditional
+import asyncio, httpx
+
+class _PrefetchStream:
+    """Tek bir media playlist'in (URL + headerlar) prefetch durumu"""
+
+    __slots__ = ("segments", "is_vod", "headers", "semaphore", "pending", "windows", "last_seen")
+
+    def __init__(self, headers: dict, concurrency: int):
+        self.segments  : list[str]                                       = []
+        self.is_vod                                                      = False
+        self.headers                                                     = headers
+        self.semaphore                                                   = asyncio.Semaphore(concurrency)
+        self.pending   : dict[str, asyncio.Task]                         = {}
+        self.windows   : OrderedDict[str, tuple[tuple[str, ...], float]] = OrderedDict()  # client -> (pencere, last_seen)
+        self.last_seen                                                   = monotonic()
+
+class SegmentPrefetcher:
+    """
+    force_proxy HLS oynatımında sıradaki K segment'i arka planda segment_cache'e çeker
+    - Playlist'i ilk kez açan her izleyici için ilk pencere (VOD: baş, live: son K segment) önden çekilir
+    - Pencere izleyici (IP) başınadır: her segment isteğinde o izleyicinin penceresi segment'in arkasına kayar,
+      bekleyen prefetch sadece hiçbir izleyicinin penceresinde kalmadıysa (seek) iptal edilir
+    - Stream başına eşzamanlılık limiti, istemciler segment istemeyi bırakınca (idle) tüm prefetch'ler iptal
+    - Idle olup düşen stream'lerin segment listesi bir süre saklanır; playlist manifest cache'inden
+      sunulduğunda (resume) upstream'e gitmeden prefetch yeniden başlar
+    """
+
+    SWEEP_INTERVAL = 5.0
+    MAX_WINDOWS    = 64  # Stream başına takip edilen en fazla izleyici penceresi
+
+    def __init__(self, lookahead: int = 3, concurrency: int = 2, idle_seconds: int = 30, max_streams: int = 256):
+        self.lookahead    = lookahead
+        self.concurrency  = max(1, concurrency)
+        self.idle_seconds = idle_seconds
+        self.max_streams  = max_streams
+
+        self._streams       : OrderedDict[str, _PrefetchStream] = OrderedDict()
+        self._dormant       : OrderedDict[str, _PrefetchStream] = OrderedDict()  # Idle düşmüş, resume edilebilir
+        self._segment_index : dict[str, tuple[str, int]]        = {}  # segment url -> (stream key, sıra)
+        self._last_sweep                                        = monotonic()
+        self._fetched                                           = 0
+        self._cancelled                                         = 0
+        self._resumed                                           = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.lookahead > 0
+
+    @staticmethod
+    def _key(playlist_url: str, headers: dict) -> tuple[str, dict]:
+        # Segment istekleri playlist ile aynı headerları taşır, Range ve client'ın koşullu headerları hariç
+        headers = {k: v for k, v in strip_conditional(headers).items() if k.lower() != "range"}
+        return coalesce_key(playlist_url, headers), headers
+
+    def register(self, playlist_url: str, headers: dict, segments: list[str], is_vod: bool, client: str = ""):
+        """Rewrite edilmiş media playlist'in segment listesini kaydeder"""
+        if not self.enabled or not segments:
+            return
+
+        key, headers = self._key(playlist_url, headers)
+        stream       = self._streams.get(key) or self._dormant.pop(key, None)
+        if stream is None:
+            stream = _PrefetchStream(headers, self.concurrency)
+        elif key in self._streams:
+            # Live playlist kaydı: pencereden çıkan eski segment'leri index'ten düş
+            self._unindex(key, stream)
+            for index, url in enumerate(segments):
+                self._segment_index[url] = (key, index)
+
+        stream.segments = segments
+        stream.is_vod   = is_vod
+        self._attach(key, stream, client)
+
+    def resume(self, playlist_url: str, headers: dict, client: str = ""):
+        """Playlist cache'ten sunuldu - bilinen segment listesiyle prefetch'i sürdür / yeniden başlat"""
+        if not self.enabled:
+            return
+
+        key, _ = self._key(playlist_url, headers)
+        stream = self._streams.get(key)
+        if stream is None and (stream := self._dormant.pop(key, None)) is not None:
+            self._resumed += 1
+        if stream is not None:
+            self._attach(key, stream, client)
+
+    def _attach(self, key: str, stream: _PrefetchStream, client: str):
+        if key not in self._streams:
+            self._streams[key] = stream
+            for index, url in enumerate(stream.segments):
+                self._segment_index[url] = (key, index)
+            while len(self._streams) > self.max_streams:
+                self._drop(next(iter(self._streams)))
+        else:
+            self._streams.move_to_end(key)
+
+        stream.last_seen = monotonic()  # Playlist yenilemesi de istemcinin hala izlediğini gösterir
+
+        # Yeni izleyici - oynatıcılar VOD'u baştan, live'ı sona yakın başlatır
+        if client not in stream.windows:
+            self._schedule(stream, client, 0 if stream.is_vod else max(0, len(stream.segments) - self.lookahead))
+
+        self._sweep()
+
+    def on_segment_request(self, segment_url: str, client: str = ""):
+        """İstemci bir segment istedi - o istemcinin penceresini bu segment'in arkasına kaydır"""
+        if not self.enabled or (found := self._segment_index.get(segment_url)) is None:
+            return
+
+        key, index = found
+        stream     = self._streams.get(key)
+        if stream is None:
+            return
+
+        stream.last_seen = monotonic()
+        self._schedule(stream, client, index + 1)
+        self._sweep()
+
+    def _schedule(self, stream: _PrefetchStream, client: str, start: int):
+        now    = monotonic()
+        window = tuple(stream.segments[start:start + self.lookahead])
+
+        stream.windows.pop(client, None)
+        stream.windows[client] = (window, now)
+        while len(stream.windows) > self.MAX_WINDOWS or now - next(iter(stream.windows.values()))[1] > self.idle_seconds:
+            stream.windows.popitem(last=False)
+
+        # Seek: hiçbir izleyicinin penceresinde olmayan bekleyen prefetch'ler boşuna bant harcamasın
+        wanted = {url for urls, _ in stream.windows.values() for url in urls}
+        for url in [url for url in stream.pending if url not in wanted]:
+            stream.pending.pop(url).cancel()
+            self._cancelled += 1
+
+        for url in window:
+            if url in stream.pending or url in segment_cache:
+                continue
+            task                = asyncio.create_task(self._prefetch(stream, url))
+            stream.pending[url] = task
+            task.add_done_callback(lambda t, url=url: stream.pending.pop(url, None) if stream.pending.get(url) is t else None)
+
+    async def _prefetch(self, stream: _PrefetchStream, url: str):
+        async with stream.semaphore:
+            if monotonic() - stream.last_seen > self.idle_seconds or url in segment_cache:
+                return
+
+            try:
+                # fetch_shared: istemcinin aynı anda gelen isteği bu fetch'e bağlanır
+                result = await fetch_shared(url, stream.headers, lambda r: 0 < int(r.headers.get("content-length", "0") or "0") <= SEGMENT_BODY_LIMIT)
+            except Exception:
+                return
+
+            if isinstance(result, UpstreamBody):
+                if result.status_code == 200:
+                    await segment_cache.set(url, result.content, get_validators(result.headers))
+                    self._fetched += 1
+            elif isinstance(result, httpx.Response):
+                await result.aclose()  # Boyutu bilinmiyor/çok büyük - cache'e alınamaz
+
+    def _unindex(self, key: str, stream: _PrefetchStream):
+        for url in stream.segments:
+            if self._segment_index.get(url, (None,))[0] == key:
+                del self._segment_index[url]
+
+    def _drop(self, key: str):
+        """Stream'i durdurur - segment listesi resume için dormant'ta kalır"""
+        stream = self._streams.pop(key, None)
+        if stream is None:
+            return
+
+        for task in stream.pending.values():
+            task.cancel()
+            self._cancelled += 1
+        stream.pending.clear()
+        stream.windows.clear()
+        self._unindex(key, stream)
+
+        self._dormant.pop(key, None)
+        self._dormant[key] = stream
+        while len(self._dormant) > self.max_streams:
+            self._dormant.popitem(last=False)
+
+    def _sweep(self):
+        """İstemcisi gitmiş stream'leri ve prefetch'lerini temizle"""
+        now = monotonic()
+        if now - self._last_sweep < self.SWEEP_INTERVAL:
+            return
+
+        self._last_sweep = now
+        for key in [key for key, stream in self._streams.items() if now - stream.last_seen > self.idle_seconds]:
+            self._drop(key)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled"   : self.enabled,
+            "lookahead" : self.lookahead,
+            "streams"   : len(self._streams),
+            "dormant"   : len(self._dormant),
+            "resumed"   : self._resumed,
+            "pending"   : sum(len(stream.pending) for stream in self._streams.values()),
+            "fetched"   : self._fetched,
+            "cancelled" : self._cancelled,
+        }
+
+# Global prefetcher instance
+segment_prefetcher = SegmentPrefetcher(PREFETCH_SEGMENTS, PREFETCH_CONCURRENCY, PREFETCH_IDLE)
@@ -0,0 +1,224 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from CLI         import konsol
+from collections import OrderedDict
+from time        import time
+from Settings    import RANGE_CACHE_MB, RANGE_BLOCK_KB
+from .helpers    import shared_client
+import re
+
+_RANGE         = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$", re.IGNORECASE)
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)", re.IGNORECASE)
+
+def parse_range(header: str) -> tuple[int | None, int | None] | None:
+    """'bytes=a-b' / 'bytes=a-' / 'bytes=-n' -> (a, b) | (a, None) | (None, n). Çoklu aralık desteklenmez."""
+    match = _RANGE.match(header or "")
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+
+    start = int(match.group(1)) if match.group(1) else None
+    end   = int(match.group(2)) if match.group(2) else None
+    if start is not None and end is not None and end < start:
+        return None
+    return start, end
+
+def parse_content_range(header: str) -> tuple[int, int, int | None] | None:
+    """'bytes a-b/total' -> (a, b, total | None)"""
+    match = _CONTENT_RANGE.search(header or "")
+    if not match:
+        return None
+    total = None if match.group(3) == "*" else int(match.group(3))
+    return int(match.group(1)), int(match.group(2)), total
+
+class RangeCache:
+    """
+    Byte-range blok cache'i - progresif MP4 seek'leri ve EXT-X-BYTERANGE segment'leri için
+    - Dosyalar sabit boyutlu bloklar halinde saklanır: {(url, blok_no): bytes}
+    - Range istekleri cache'teki bloklardan karşılanır, sadece eksik blok aralıkları upstream'den çekilir
+    - Tek seferde ardışık okunan blok sayısı sınırlıdır; uzun oynatma akışı cache'i silip süpürmez
+    - Byte bütçesi aşılınca en az kullanılan bloklar silinir
+    """
+
+    MAX_RUN_BLOCKS = 8  # Bir upstream okumasından cache'e alınacak en fazla blok
+
+    def __init__(self, max_size_mb: int = 64, block_size: int = 1024 * 1024, ttl_seconds: int = 3600):
+        self.block_size     = block_size
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.ttl_seconds    = ttl_seconds
+
+        # {(url, blok_no): (data, created_at)} - baştaki en az kullanılan
+        self._blocks      : OrderedDict[tuple[str, int], tuple[bytes, float]] = OrderedDict()
+        # {url: (toplam_boyut, content_type, validators, created_at)} - HEAD ve Range istekleri ortak kullanır
+        self._meta        : OrderedDict[str, tuple[int, str, tuple | None, float]] = OrderedDict()
+        # Range desteklemediği görülen URL'ler - tekrar denenmez
+        self._unsupported : OrderedDict[str, float]                               = OrderedDict()
+
+        self._total_size  = 0
+        self._hits        = 0
+        self._misses      = 0
+        self._meta_hits   = 0
+        self._meta_misses = 0
+
+    # ----------------------------------------» Meta
+    def get_meta(self, url: str) -> tuple[int, str, tuple[str | None, str | None] | None] | None:
+        """(toplam_boyut, content_type, (etag, last_modified) | None)"""
+        entry = self._meta.get(url)
+        if entry is None or time() - entry[3] > self.ttl_seconds:
+            if entry is not None:
+                del self._meta[url]
+            self._meta_misses += 1
+            return None
+
+        self._meta.move_to_end(url)
+        self._meta_hits += 1
+        return entry[0], entry[1], entry[2]
+
+    def set_meta(self, url: str, total: int, content_type: str, validators: tuple[str | None, str | None] | None = None):
+        self._meta.pop(url, None)
+        self._meta[url] = (total, content_type, validators, time())
+        while len(self._meta) > 4096:
+            self._meta.popitem(last=False)
+
+    def is_unsupported(self, url: str) -> bool:
+        return url in self._unsupported
+
+    def mark_unsupported(self, url: str):
+        self._unsupported[url] = time()
+        while len(self._unsupported) > 1024:
+            self._unsupported.popitem(last=False)
+
+    # ----------------------------------------» Bloklar
+    def get_block(self, url: str, index: int) -> bytes | None:
+        key   = (url, index)
+        entry = self._blocks.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        if time() - entry[1] > self.ttl_seconds:
+            self._remove(key)
+            self._misses += 1
+            return None
+
+        self._blocks.move_to_end(key)
+        self._hits += 1
+        return entry[0]
+
+    def has_block(self, url: str, index: int) -> bool:
+        return (url, index) in self._blocks
+
+    def set_block(self, url: str, index: int, data: bytes):
+        key = (url, index)
+        self._remove(key)
+        self._blocks[key] = (data, time())
+        self._total_size += len(data)
+
+        while self._total_size > self.max_size_bytes and self._blocks:
+            self._remove(next(iter(self._blocks)))
+
+    def _remove(self, key: tuple[str, int]):
+        if entry := self._blocks.pop(key, None):
+            self._total_size -= len(entry[0])
+
+    # ----------------------------------------» Okuma
+    async def iter_range(self, url: str, headers: dict, start: int, end: int, total: int):
+        """[start, end] aralığını yield eder, upstream hatasında akışı güvenle keser"""
+        try:
+            async for piece in self._iter_range(url, headers, start, end, total):
+                yield piece
+        except Exception as e:
+            konsol.print(f"[red]Range stream hatası: {str(e)}[/red]")
+
+    async def _iter_range(self, url: str, headers: dict, start: int, end: int, total: int):
+        """
+        [start, end] aralığını yield eder.
+        Cache'teki bloklar doğrudan, eksik blok aralıkları tek bir hizalı upstream Range isteğiyle
+        çekilir; gelen veri beklemeden client'a akarken tamamlanan bloklar cache'e yazılır.
+        """
+        block_size = self.block_size
+        last_block = end // block_size
+        position   = start
+
+        while position <= end:
+            index = position // block_size
+            block = self.get_block(url, index)
+
+            if block is not None:
+                offset = position - index * block_size
+                piece  = block[offset:min(len(block), end - index * block_size + 1)]
+                if not piece:
+                    return  # Dosya küçülmüş - eldeki kadarı
+                yield piece
+                position += len(piece)
+                continue
+
+            # Eksik blok aralığı: bir sonraki cache'li bloğa ya da son bloğa kadar
+            run_end = index
+            while run_end < last_block and not self.has_block(url, run_end + 1):
+                run_end += 1
+
+            fetch_start = index * block_size
+            fetch_end   = min(total - 1, (run_end + 1) * block_size - 1)
+            cursor      = fetch_start
+            block_index = index
+            buffer      = bytearray()
+            fetched     = False
+
+            req_headers          = {k: v for k, v in headers.items() if k.lower() != "range"}
+            req_headers["Range"] = f"bytes={fetch_start}-{fetch_end}"
+            request              = shared_client.build_request("GET", url, headers=req_headers)
+            response             = await shared_client.send(request, stream=True)
+            try:
+                if response.status_code != 206:
+                    konsol.print(f"[yellow]Range cache: beklenmeyen upstream durumu {response.status_code}[/yellow]")
+                    return
+
+                async for chunk in response.aiter_bytes():
+                    chunk_end = cursor + len(chunk)
+
+                    # İstenen aralığa düşen kısmı hemen ilet
+                    low  = max(cursor, position)
+                    high = min(chunk_end, end + 1)
+                    if low < high:
+                        yield chunk if (low, high) == (cursor, chunk_end) else chunk[low - cursor:high - cursor]
+                        position = high
+                        fetched  = True
+
+                    cursor = chunk_end
+
+                    # Blokları topla - ardışık okuma limiti aşılınca sadece ilet
+                    if buffer is not None:
+                        buffer += chunk
+                        while len(buffer) >= block_size:
+                            self.set_block(url, block_index, bytes(buffer[:block_size]))
+                            del buffer[:block_size]
+                            block_index += 1
+                        if block_index - index >= self.MAX_RUN_BLOCKS:
+                            buffer = None
+                            if position > end:
+                                break
+
+                # Dosyanın son (kısa) bloğu
+                if buffer and cursor == total:
+                    self.set_block(url, block_index, bytes(buffer))
+            finally:
+                await response.aclose()
+
+            if not fetched:
+                return  # Upstream beklenenden kısa döndü
+
+    def get_stats(self) -> dict:
+        return {
+            "total_blocks"  : len(self._blocks),
+            "total_size_mb" : round(self._total_size / (1024 * 1024), 2),
+            "max_size_mb"   : round(self.max_size_bytes / (1024 * 1024), 2),
+            "block_kb"      : self.block_size // 1024,
+            "known_files"   : len(self._meta),
+            "hits"          : self._hits,
+            "misses"        : self._misses,
+            "meta_hits"     : self._meta_hits,
+            "meta_misses"   : self._meta_misses,
+        }
+
+# Global cache instance
+range_cache = RangeCache(RANGE_CACHE_MB, RANGE_BLOCK_KB * 1024)
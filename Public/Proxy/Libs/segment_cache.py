@@ -1,6 +1,9 @@
 # Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
 
-from time import time
+from collections import OrderedDict
+from time        import time
+from Settings    import SEGMENT_L2_DIR, SEGMENT_L2_SIZE_MB, SEGMENT_L2_TTL
+from .disk_cache import DiskSegmentCache
 import asyncio
 
 class SegmentCache:
@@ -9,37 +12,95 @@ class SegmentCache:
     - 32MB boyut limiti
     - En az kullanılan (LRU) segment'ler silinir
     - 5 dakika hard TTL
+    - get / set / eviction O(1): LRU sırası ve expiry sırası iki ayrı OrderedDict'te tutulur
+    - Opsiyonel L2 (disk/tmpfs): LRU'dan düşen segment'ler L2'ye iner, L2 hit'leri L1'e geri çıkar
+    - TTL'i dolan ve ETag/Last-Modified'ı olan segment'ler stale olarak bir süre daha tutulur;
+      upstream'e koşullu istekle doğrulanırsa (304) gövde tekrar indirilmeden yenilenir
     """
 
-    def __init__(self, max_size_mb: int = 32, hard_ttl_seconds: int = 300):
+    def __init__(self, max_size_mb: int = 32, hard_ttl_seconds: int = 300, l2: DiskSegmentCache | None = None):
         self.max_size_bytes   = max_size_mb * 1024 * 1024
         self.max_item_bytes   = 5 * 1024 * 1024  # 5MB tekil segment limiti
+        self.max_stale_bytes  = self.max_size_bytes // 4  # Doğrulama bekleyen stale entry bütçesi
         self.hard_ttl_seconds = hard_ttl_seconds
 
-        # Cache storage: {url: (content, created_at, last_access, size)}
-        self._cache      : dict[str, tuple[bytes, float, float, int]] = {}
-        self._total_size                                              = 0
-        self._lock                                                    = asyncio.Lock()
+        # LRU sırası: {url: (content, created_at, size, validators)} - baştaki en az kullanılan
+        self._cache  : OrderedDict[str, tuple[bytes, float, int, tuple | None]] = OrderedDict()
+        # Expiry index: {url: created_at} - TTL herkes için aynı olduğundan ekleme sırası = bitiş sırası
+        self._expiry : OrderedDict[str, float]                                  = OrderedDict()
+        # TTL'i dolmuş ama doğrulanabilir entry'ler: {url: (content, validators, size)}
+        self._stale  : OrderedDict[str, tuple[bytes, tuple, int]]               = OrderedDict()
 
-    async def get(self, url: str) -> bytes | None:
-        """Cache'den segment al ve access time'ı güncelle"""
-        async with self._lock:
-            if url not in self._cache:
-                return None
+        self._total_size = 0
+        self._stale_size = 0
+        self._hits       = 0
+        self._misses     = 0
+        self._evictions  = 0
 
-            content, created_at, _, size = self._cache[url]
+        self._l2         = l2 if l2 and l2.enabled else None
+        if self._l2:
+            # L2'den hard TTL'i geçmiş entry doğrudan sunulmaz - daha uzun TTL sadece disk bütçesi yer
+            self._l2.ttl_seconds = min(self._l2.ttl_seconds, hard_ttl_seconds)
+        self._demotions  : set[asyncio.Task] = set()
 
-            # Hard TTL kontrolü
-            if time() - created_at > self.hard_ttl_seconds:
-                del self._cache[url]
-                self._total_size -= size
-                return None
+        # Lock yok: asyncio tek thread'de çalışır ve L1 işlemleri içinde await noktası bulunmaz,
+        # dolayısıyla her çağrı atomiktir - okumalar birbirini beklemez.
 
-            # Last access time'ı güncelle (LRU için)
-            self._cache[url] = (content, created_at, time(), size)
-            return content
+    def __contains__(self, url: str) -> bool:
+        """İstatistik ve LRU sırasına dokunmadan L1'de var mı bak (prefetch kontrolü için)"""
+        return url in self._cache
 
-    async def set(self, url: str, content: bytes):
+    async def get(self, url: str) -> bytes | None:
+        """Cache'den segment al ve LRU sırasını güncelle"""
+        entry = self._cache.get(url)
+        if entry is None:
+            return await self._get_from_l2(url)
+
+        content, created_at, _, _ = entry
+
+        # Hard TTL kontrolü - L2 kopyası da aynı created_at'i taşıdığından oraya düşmeye gerek yok
+        if time() - created_at > self.hard_ttl_seconds:
+            self._remove(url, keep_stale=True)
+            self._misses += 1
+            return None
+
+        # En sona taşı (LRU için)
+        self._cache.move_to_end(url)
+        self._hits += 1
+        return content
+
+    async def _get_from_l2(self, url: str) -> bytes | None:
+        """
+        L1 miss'te L2'ye bak, bulunursa L1'e promote et (L2 kopyası yerinde kalır)
+        Promote edilen segment ilk created_at'ini ve validator'larını korur - hard TTL uzamaz,
+        TTL'i dolmuşsa doğrulanabilir stale olarak beklenir
+        """
+        entry = await self._l2.get(url) if self._l2 else None
+        if entry is None:
+            self._misses += 1
+            return None
+
+        content, created_at, validators = entry
+        if time() - created_at > self.hard_ttl_seconds:
+            self._keep_stale(url, content, validators)
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._insert(url, content, validators, created_at)
+        return content
+
+    def validators(self, url: str) -> tuple[str | None, str | None] | None:
+        """L1'deki segment'in upstream (ETag, Last-Modified) değerleri"""
+        entry = self._cache.get(url)
+        return entry[3] if entry else None
+
+    def get_stale(self, url: str) -> tuple[bytes, tuple[str | None, str | None]] | None:
+        """TTL'i dolmuş ama upstream'de koşullu istekle doğrulanabilecek segment"""
+        entry = self._stale.get(url)
+        return (entry[0], entry[1]) if entry else None
+
+    async def set(self, url: str, content: bytes, validators: tuple[str | None, str | None] | None = None):
         """Segment'i cache'e ekle"""
         content_size = len(content)
 
@@ -47,43 +108,91 @@ class SegmentCache:
         if content_size > self.max_item_bytes or content_size > self.max_size_bytes:
             return
 
-        async with self._lock:
-            # Eğer bu URL zaten cache'deyse, önce eski boyutunu çıkar
-            if url in self._cache:
-                _, _, _, old_size = self._cache[url]
-                self._total_size -= old_size
-
-            # Yeni içeriği ekle (content, created_at, last_access, size)
-            current_time     = time()
-            self._cache[url] = (content, current_time, current_time, content_size)
-            self._total_size += content_size
-
-            # LRU eviction - boyut limiti aşıldıysa en az kullanılanları sil
-            await self._evict_if_needed()
-
-    async def _evict_if_needed(self):
-        """Gerekirse en az kullanılan ve süresi dolmuş itemları sil"""
-        current_time = time()
-
-        # Hard TTL dolmuş itemları temizle
-        expired_urls = [
-            url for url, (_, created_at, _, _) in self._cache.items()
-            if current_time - created_at > self.hard_ttl_seconds
-        ]
-        for url in expired_urls:
-            _, _, _, size = self._cache[url]
-            del self._cache[url]
-            self._total_size -= size
-
-        # Hala limit aşılmışsa, en az kullanılan (LRU) itemları sil
-        while self._total_size > self.max_size_bytes:
-            if not self._cache:
-                break
+        self._insert(url, content, validators)
+
+    def _insert(self, url: str, content: bytes, validators: tuple | None = None, created_at: float | None = None):
+        content_size = len(content)
+
+        # Eğer bu URL zaten cache'deyse, önce eskisini çıkar (her iki sıradan da)
+        if url in self._cache:
+            self._remove(url)
+        if stale := self._stale.pop(url, None):
+            self._stale_size -= stale[2]
+
+        current_time      = time()
+        created_at        = created_at or current_time
+        self._cache[url]  = (content, created_at, content_size, validators)
+        self._expiry[url] = created_at
+        self._total_size += content_size
+
+        # Promote edilen eski entry çoğu zaman en erken biten - expiry sırasının başına alınır
+        # (sıra kesin değilse de get TTL'i ayrıca kontrol eder)
+        if created_at < current_time:
+            self._expiry.move_to_end(url, last=False)
 
-            lru_url = min(self._cache.items(), key=lambda x: x[1][2])[0]
-            _, _, _, size = self._cache[lru_url]
-            del self._cache[lru_url]
-            self._total_size -= size
+        self._evict_if_needed(current_time)
+
+    def _remove(self, url: str, keep_stale: bool = False) -> tuple[bytes, float, int, tuple | None] | None:
+        """Entry'yi LRU ve expiry index'ten birlikte siler - keep_stale ile doğrulanabilirse stale'e taşır"""
+        entry = self._cache.pop(url, None)
+        if entry is None:
+            return None
+
+        self._expiry.pop(url, None)
+        self._total_size -= entry[2]
+
+        if keep_stale:
+            self._keep_stale(url, entry[0], entry[3])
+
+        return entry
+
+    def _keep_stale(self, url: str, content: bytes, validators: tuple | None):
+        """Doğrulanabilir (validator'ı olan) entry'yi stale bütçesine al"""
+        size = len(content)
+        if not validators or size > self.max_stale_bytes:
+            return
+
+        if old := self._stale.pop(url, None):
+            self._stale_size -= old[2]
+        self._stale[url]  = (content, validators, size)
+        self._stale_size += size
+        while self._stale_size > self.max_stale_bytes:
+            self._stale_size -= self._stale.popitem(last=False)[1][2]
+
+    def _evict_if_needed(self, current_time: float):
+        """Süresi dolmuşları baştan, limit aşılırsa en az kullanılanları sil - her adım O(1)"""
+        # Hard TTL dolmuş itemlar expiry index'in başında toplanır, ilk taze entry'de dur
+        while self._expiry:
+            url, created_at = next(iter(self._expiry.items()))
+            if current_time - created_at <= self.hard_ttl_seconds:
+                break
+            self._remove(url, keep_stale=True)
+
+        # Hala limit aşılmışsa, en az kullanılan (LRU) itemları sil - L2 varsa oraya indir
+        demoted = []
+        while self._total_size > self.max_size_bytes and self._cache:
+            url   = next(iter(self._cache))
+            entry = self._remove(url)
+            self._evictions += 1
+            if self._l2:
+                demoted.append((url, entry[0], entry[1], entry[3]))
+
+        if demoted:
+            task = asyncio.get_running_loop().create_task(self._demote(demoted))
+            self._demotions.add(task)
+            task.add_done_callback(self._demotions.discard)
+
+    async def _demote(self, demoted: list[tuple[str, bytes, float, tuple | None]]):
+        """L1'den düşen segment'leri arka planda L2'ye yazar"""
+        for url, content, created_at, validators in demoted:
+            # Promote edilmiş kopya hala diskte ve aynı sürümse sadece yaşı / validator'ları tazelenir
+            if not self._l2.refresh(url, created_at, validators):
+                await self._l2.set(url, content, created_at, validators)
+
+    def flush(self):
+        """L2 index'ini diske yazar (shutdown'da çağrılır)"""
+        if self._l2:
+            self._l2.flush()
 
     def get_stats(self) -> dict:
         """Cache istatistikleri"""
@@ -92,7 +201,16 @@ class SegmentCache:
             "total_size_mb"    : round(self._total_size / (1024 * 1024), 2),
             "max_size_mb"      : round(self.max_size_bytes / (1024 * 1024), 2),
             "hard_ttl_minutes" : self.hard_ttl_seconds // 60,
+            "hits"             : self._hits,
+            "misses"           : self._misses,
+            "evictions"        : self._evictions,
+            "stale_items"      : len(self._stale),
+            "l2"               : self._l2.get_stats() if self._l2 else None,
         }
 
 # Global cache instance
-segment_cache = SegmentCache(max_size_mb=32, hard_ttl_seconds=300)
+segment_cache = SegmentCache(
+    max_size_mb      = 32,
+    hard_ttl_seconds = 300,
+    l2               = DiskSegmentCache(SEGMENT_L2_DIR, SEGMENT_L2_SIZE_MB, SEGMENT_L2_TTL) if SEGMENT_L2_DIR else None,
+)
@@ -0,0 +1,105 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from urllib.parse import urlsplit
+from time         import monotonic
+
+class StreamMeter:
+    """
+    Tek bir client stream'inin sayaçları ve uyarlanabilir batch boyutu
+    - Küçük upstream buffer'ları client'a gönderilmeden önce batch_target'a kadar birleştirilir
+    - batch_target, gözlenen akış hızının BATCH_WINDOW saniyelik karşılığıdır: hızlı client'a
+      daha az sayıda büyük gönderim, yavaş client'a küçük ve sık gönderim
+    """
+
+    __slots__ = ("url", "mode", "started", "bytes", "sends", "rate", "batch_target", "_last", "_window_bytes")
+
+    BATCH_MIN    = 16 * 1024
+    BATCH_MAX    = 1024 * 1024
+    BATCH_WINDOW = 0.02  # Seconds - bir gönderimin temsil edeceği akış süresi
+    RATE_WINDOW  = 0.25  # Seconds - hız ölçüm penceresi
+
+    def __init__(self, url: str, mode: str):
+        self.url           = self.public_url(url)
+        self.mode          = mode  # raw | decoded
+        self.started       = monotonic()
+        self.bytes         = 0
+        self.sends         = 0
+        self.rate          = 0.0   # bytes/s (EWMA)
+        self.batch_target  = self.BATCH_MIN
+        self._last         = self.started
+        self._window_bytes = 0
+
+    @staticmethod
+    def public_url(url: str) -> str:
+        """/proxy/stats herkese açık - imzalı CDN token'ları taşıyan query string ve fragment atılır"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc.rpartition('@')[2]}{parts.path}"
+
+    def sent(self, size: int):
+        """Client'a bir parça gönderildi - hız ve batch hedefini güncelle"""
+        self.bytes         += size
+        self.sends         += 1
+        self._window_bytes += size
+
+        now     = monotonic()
+        elapsed = now - self._last
+        if elapsed < self.RATE_WINDOW:
+            return
+
+        current            = self._window_bytes / elapsed
+        self.rate          = current if not self.rate else self.rate * 0.7 + current * 0.3
+        self.batch_target  = int(min(self.BATCH_MAX, max(self.BATCH_MIN, self.rate * self.BATCH_WINDOW)))
+        self._last         = now
+        self._window_bytes = 0
+
+class StreamStats:
+    """Aktif stream'lerin ve toplam trafiğin sayaçları - /proxy/stats için"""
+
+    MAX_LISTED = 50
+
+    def __init__(self):
+        self._active        : dict[int, StreamMeter] = {}
+        self._streams_total                          = 0
+        self._bytes_total                            = 0
+        self._sends_total                            = 0
+        self._modes         : dict[str, int]         = {"raw": 0, "decoded": 0}
+
+    def open(self, url: str, mode: str) -> StreamMeter:
+        meter                   = StreamMeter(url, mode)
+        self._active[id(meter)] = meter
+        self._streams_total    += 1
+        self._modes[mode]       = self._modes.get(mode, 0) + 1
+        return meter
+
+    def close(self, meter: StreamMeter):
+        if self._active.pop(id(meter), None) is not None:
+            self._bytes_total += meter.bytes
+            self._sends_total += meter.sends
+
+    def get_stats(self) -> dict:
+        now    = monotonic()
+        active = sorted(self._active.values(), key=lambda meter: meter.rate, reverse=True)
+
+        return {
+            "active"          : len(active),
+            "streams_total"   : self._streams_total,
+            "modes"           : dict(self._modes),
+            "bytes_total"     : self._bytes_total + sum(meter.bytes for meter in active),
+            "sends_total"     : self._sends_total + sum(meter.sends for meter in active),
+            "throughput_mbps" : round(sum(meter.rate for meter in active) * 8 / 1e6, 2),
+            "streams"         : [
+                {
+                    "url"      : meter.url,
+                    "mode"     : meter.mode,
+                    "bytes"    : meter.bytes,
+                    "sends"    : meter.sends,
+                    "mbps"     : round(meter.rate * 8 / 1e6, 2),
+                    "batch_kb" : meter.batch_target // 1024,
+                    "age"      : round(now - meter.started, 1),
+                }
+                for meter in active[:self.MAX_LISTED]
+            ],
+        }
+
+# Global stream istatistikleri
+stream_stats = StreamStats()
@@ -0,0 +1,147 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from collections import OrderedDict
+from hashlib     import sha1
+from time        import monotonic
+from Settings    import SUBTITLE_CACHE_MB, SUBTITLE_TTL, SUBTITLE_MAX_KB
+from .helpers    import shared_client, SubtitleConverter, conditional_headers
+from .upstream   import coalesce_key
+import asyncio
+
+class SubtitleEntry:
+    """Dönüştürülmüş VTT ve doğrulayıcıları - upstream_etag / last_modified süresi dolunca koşullu istekte kullanılır"""
+
+    __slots__ = ("content", "etag", "last_modified", "upstream_etag", "created_at")
+
+    def __init__(self, content: bytes, last_modified: str | None, upstream_etag: str | None):
+        self.content       = content
+        self.etag          = f'"{sha1(content).hexdigest()[:20]}"'  # Dönüştürülmüş içeriğin ETag'i
+        self.last_modified = last_modified
+        self.upstream_etag = upstream_etag
+        self.created_at    = monotonic()
+
+class SubtitleCache:
+    """
+    Dönüştürülmüş altyazı cache'i - URL anahtarlı
+    - Aynı bölümü izleyen herkese altyazı bellekten, dönüştürme yapılmadan verilir
+    - Aynı anda gelen miss'ler tek upstream isteği + tek dönüştürmede birleşir
+    - Boyut limiti aşılınca en az kullanılan (LRU) altyazılar silinir
+    - Süresi dolan ama upstream ETag/Last-Modified'ı olan altyazılar stale kalır; koşullu istek
+      304 dönerse yeniden indirilip dönüştürülmeden tazelenir
+    - Upstream gövdesi max_entry_bytes'ı aşan altyazılar belleğe alınmaz (413)
+    """
+
+    def __init__(self, max_size_mb: int = 16, ttl_seconds: int = 3600, max_entry_kb: int = 4096):
+        self.max_size_bytes  = max_size_mb * 1024 * 1024
+        self.ttl_seconds     = ttl_seconds
+        self.max_entry_bytes = max_entry_kb * 1024
+
+        self._cache       : OrderedDict[str, SubtitleEntry] = OrderedDict()
+        self._inflight    : dict[str, asyncio.Task]         = {}
+        self._total_size                                    = 0
+        self._hits                                          = 0
+        self._misses                                        = 0
+        self._coalesced                                     = 0
+        self._revalidated                                   = 0
+        self._too_large                                     = 0
+
+    def get(self, url: str) -> SubtitleEntry | None:
+        entry = self._cache.get(url)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        if monotonic() - entry.created_at > self.ttl_seconds:
+            if not (entry.upstream_etag or entry.last_modified):
+                self._remove(url)  # Doğrulanamaz - stale tutmanın anlamı yok
+            self._misses += 1
+            return None
+
+        self._cache.move_to_end(url)
+        self._hits += 1
+        return entry
+
+    def set(self, url: str, entry: SubtitleEntry):
+        size = len(entry.content)
+        if size > self.max_size_bytes:
+            return
+
+        self._remove(url)
+        self._cache[url]  = entry
+        self._total_size += size
+
+        while self._total_size > self.max_size_bytes and self._cache:
+            self._remove(next(iter(self._cache)))
+
+    def _remove(self, url: str):
+        if entry := self._cache.pop(url, None):
+            self._total_size -= len(entry.content)
+
+    async def fetch(self, url: str, headers: dict) -> SubtitleEntry | int:
+        """Upstream'den çekip dönüştürür ve cache'e koyar; upstream hatasında durum kodu döner"""
+        key  = coalesce_key(url, headers)
+        task = self._inflight.get(key)
+        if task is None:
+            task                = asyncio.create_task(self._fetch(url, headers))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        else:
+            self._coalesced += 1
+
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str, headers: dict) -> SubtitleEntry | int:
+        # Süresi dolmuş entry varsa upstream'e onun doğrulayıcılarıyla sorulur
+        stale = self._cache.get(url)
+        if stale is not None:
+            headers = {**headers, **conditional_headers((stale.upstream_etag, stale.last_modified))}
+
+        req      = shared_client.build_request("GET", url, headers=headers)
+        response = await shared_client.send(req, stream=True)
+        try:
+            if response.status_code == 304 and stale is not None:
+                stale.created_at = monotonic()
+                if url in self._cache:
+                    self._cache.move_to_end(url)
+                self._revalidated += 1
+                return stale
+
+            if response.status_code >= 400 or response.status_code == 304:
+                return response.status_code
+
+            if int(response.headers.get("content-length", "0") or "0") > self.max_entry_bytes:
+                self._too_large += 1
+                return 413
+
+            # Gövde geldikçe dönüştürülür - ham gövde ayrıca biriktirilmez
+            converter = SubtitleConverter(response.headers.get("content-type", ""), url)
+            parts     = []
+            received  = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > self.max_entry_bytes:
+                    self._too_large += 1
+                    return 413
+                parts.append(converter.feed(chunk))
+            parts.append(converter.finish())
+        finally:
+            await response.aclose()
+
+        entry = SubtitleEntry(b"".join(parts), response.headers.get("last-modified"), response.headers.get("etag"))
+        self.set(url, entry)
+        return entry
+
+    def get_stats(self) -> dict:
+        return {
+            "total_items"   : len(self._cache),
+            "total_size_mb" : round(self._total_size / (1024 * 1024), 2),
+            "max_size_mb"   : round(self.max_size_bytes / (1024 * 1024), 2),
+            "hits"          : self._hits,
+            "misses"        : self._misses,
+            "coalesced"     : self._coalesced,
+            "revalidated"   : self._revalidated,
+            "too_large"     : self._too_large,
+        }
+
+# Global cache instance
+subtitle_cache = SubtitleCache(SUBTITLE_CACHE_MB, SUBTITLE_TTL, SUBTITLE_MAX_KB)
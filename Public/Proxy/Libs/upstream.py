@@ -0,0 +1,334 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from .helpers       import shared_client, detect_hls_from_url, is_hls_segment
+from .hedge         import segment_hedger
+from .memory_budget import memory_budget
+from Settings       import MANIFEST_STREAM_KB
+from typing         import Callable, Awaitable, AsyncIterator
+from weakref        import WeakKeyDictionary, finalize
+import asyncio, httpx, json
+
+SEGMENT_BODY_LIMIT   = 5 * 1024 * 1024            # Belleğe alınacak tekil segment limiti
+SHARED_BODY_LIMIT    = 64 * 1024                  # Segment olmayan (key vb.) paylaşılabilir gövde limiti
+UNKNOWN_BODY_RESERVE = 256 * 1024                 # Boyutu bilinmeyen (chunked) manifest için ön rezervasyon
+MANIFEST_BODY_LIMIT  = MANIFEST_STREAM_KB * 1024  # Bundan büyük / boyutu bilinmeyen manifest'ler akarak rewrite edilir
+
+class UpstreamBody:
+    """Tamamen okunmuş upstream yanıtı - aynı isteği bekleyen istemciler arasında paylaşılır"""
+
+    __slots__ = ("status_code", "headers", "content", "__weakref__")
+
+    def __init__(self, status_code: int, headers: httpx.Headers, content: bytes):
+        self.status_code = status_code
+        self.headers     = headers
+        self.content     = content
+
+class TeeSink:
+    """
+    Client'a stream edilen gövdenin kopyasını biriktirir (tee)
+    - Aynı isteği bekleyenler (follower) chunk'ları geldikçe okur, gövdenin bitmesini beklemez
+    - Gövde eksiksiz biterse on_complete ile commit edilir
+    - Limit aşılır, bellek bütçesi yetmez ya da boyut tutmazsa vazgeçilir; henüz byte almamış
+      bekleyenler kendi isteğini açar, client'a akış etkilenmez
+    - Stream'in sahibi koparsa ve follower varsa kalan gövde arka planda upstream'den okunmaya devam eder
+    """
+
+    __slots__ = ("key", "expected_length", "on_complete", "_chunks", "_size", "_future", "_arrived", "_followers")
+
+    def __init__(self, key: str, expected_length: int):
+        self.key             = key
+        self.expected_length = expected_length
+        self.on_complete     : Callable[[bytes], Awaitable] | None = None
+        self._chunks         : list[bytes] | None                  = []
+        self._size                                                 = 0
+        self._future                                               = asyncio.get_running_loop().create_future()
+        self._arrived                                              = asyncio.Event()
+        self._followers                                            = 0
+
+    def feed(self, chunk: bytes):
+        if self._chunks is None:
+            return
+
+        size = len(chunk)
+        if self._size + size > SEGMENT_BODY_LIMIT or not memory_budget.try_acquire(size):
+            self.abort()
+            return
+
+        self._size += size
+        self._chunks.append(chunk)
+        self._arrived.set()
+
+    async def finish(self):
+        """Upstream gövdesi sonuna kadar okundu"""
+        if self._chunks is None:
+            return
+
+        body         = b"".join(self._chunks)
+        self._chunks = None
+        self._release()
+        if self.expected_length and len(body) != self.expected_length:
+            self._resolve(None)
+            return
+
+        self._resolve(body)
+        if self.on_complete:
+            await self.on_complete(body)
+
+    def abort(self):
+        if self._chunks is not None:
+            self._chunks = None
+            self._release()
+            self._resolve(None)
+
+    def handoff(self, chunks: AsyncIterator[bytes], response: httpx.Response) -> bool:
+        """Stream'in sahibi koptu - follower varsa kalan gövdeyi onlar için arka planda oku"""
+        if self._chunks is None or not self._followers:
+            return False
+
+        asyncio.get_running_loop().create_task(self._drain(chunks, response))
+        return True
+
+    async def _drain(self, chunks: AsyncIterator[bytes], response: httpx.Response):
+        try:
+            async for chunk in chunks:
+                self.feed(chunk)
+                if self._chunks is None:
+                    break
+            await self.finish()
+        except Exception:
+            pass
+        finally:
+            self.abort()
+            await response.aclose()
+
+    def _release(self):
+        memory_budget.release(self._size)
+        self._size = 0
+
+    def _resolve(self, body: bytes | None):
+        if _tees.get(self.key) is self:
+            del _tees[self.key]
+        if not self._future.done():
+            self._future.set_result(body)
+        self._arrived.set()
+
+    async def ready(self, timeout: float) -> bool:
+        """
+        Follower olarak katılır, ilk chunk'ı ya da gövdenin tamamlanmasını bekler
+        False dönerse (vazgeçildi / zaman aşımı) katılım geri alınır
+        """
+        self._followers += 1
+        try:
+            while not self._future.done() and not self._chunks:
+                self._arrived.clear()
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            if not self._future.done() or self._future.result() is not None:
+                return True
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            self._followers -= 1
+            raise
+
+        self._followers -= 1
+        return False
+
+    def follower(self, response: httpx.Response, idle_timeout: float) -> httpx.Response:
+        """ready() sonrası - sahibin yanıtıyla aynı status/header'lı, gövdesi tee'den akan yanıt"""
+        headers = response.headers.copy()
+        if "content-encoding" in headers:
+            # Tee decode edilmiş gövdeyi tutar
+            del headers["content-encoding"]
+            headers.pop("content-length", None)
+
+        return httpx.Response(response.status_code, headers=headers, stream=_TeeStream(self, idle_timeout), request=response.request)
+
+    async def follow(self, idle_timeout: float) -> AsyncIterator[bytes]:
+        """Biriken ve gelen chunk'lar - gövde yarıda vazgeçilirse hata"""
+        index = 0
+        sent  = 0
+        while True:
+            if self._future.done():
+                if (body := self._future.result()) is None:
+                    raise httpx.ReadError("Paylaşılan stream yarıda kaldı")
+                if sent < len(body):
+                    yield body[sent:]
+                return
+
+            if index < len(self._chunks):
+                chunk  = self._chunks[index]
+                index += 1
+                sent  += len(chunk)
+                yield chunk
+                continue
+
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), idle_timeout)
+            except asyncio.TimeoutError:
+                raise httpx.ReadTimeout("Paylaşılan stream'de zaman aşımı") from None
+
+    def unfollow(self):
+        self._followers -= 1
+
+class _TeeStream(httpx.AsyncByteStream):
+    """Follower yanıtının gövdesi - tee'deki chunk'lar"""
+
+    def __init__(self, sink: TeeSink, idle_timeout: float):
+        self._sink         = sink
+        self._idle_timeout = idle_timeout
+
+    async def __aiter__(self):
+        async for chunk in self._sink.follow(self._idle_timeout):
+            yield chunk
+
+    async def aclose(self):
+        if self._sink:
+            self._sink.unfollow()
+            self._sink = None
+
+# Single-flight: aynı anahtar için uçuşta olan tek upstream isteği
+_inflight : dict[str, asyncio.Task] = {}
+# Tee edilen stream'ler: anahtar -> sink (bekleyenler için), response -> sink (stream'in sahibi için)
+_tees     : dict[str, TeeSink]                          = {}
+_tee_of   : WeakKeyDictionary[httpx.Response, TeeSink] = WeakKeyDictionary()
+
+def is_hls_response(url: str, response: httpx.Response | UpstreamBody) -> bool:
+    """HLS Tespiti (URL + Header)"""
+    content_type = response.headers.get("content-type", "").lower()
+    if "mpegurl" in content_type or "m3u8" in content_type:
+        return True
+
+    # /hls/ altındaki segment'ler URL'den manifest sanılmasın - upstream medya olarak işaretlemişse segment'tir
+    if content_type.startswith(("video/", "audio/")) and is_hls_segment(url):
+        return False
+
+    return detect_hls_from_url(url)
+
+def should_buffer(url: str, response: httpx.Response) -> bool:
+    """Belleğe okunup eşzamanlı isteklerle paylaşılacak yanıtlar"""
+    # Küçük manifest - tamamı okunup rewrite edilir; büyük / chunked olanlar akarak rewrite edilir
+    if is_hls_response(url, response):
+        return 0 < _content_length(response) <= MANIFEST_BODY_LIMIT
+
+    # Segment'ler buffer'lanmaz, stream edilirken tee ile cache'lenir (should_tee)
+    if is_hls_segment(url):
+        return False
+
+    # EXT-X-KEY gibi küçük gövdeler belleğe alınır
+    return 0 < _content_length(response) <= SHARED_BODY_LIMIT
+
+def should_tee(url: str, response: httpx.Response) -> bool:
+    """Stream edilirken kopyası paylaşılacak yanıtlar - bilinen boyutu <= 5MB ya da chunked segment / manifest'ler"""
+    if response.status_code != 200 or not (is_hls_segment(url) or is_hls_response(url, response)):
+        return False
+
+    return _content_length(response) <= SEGMENT_BODY_LIMIT
+
+def _content_length(response: httpx.Response) -> int:
+    return int(response.headers.get("content-length", "0") or "0")
+
+def coalesce_key(url: str, headers: dict) -> str:
+    """Hedef URL + upstream'e gidecek headerlar (referer, UA, extra_headers, Range) aynıysa istek aynıdır"""
+    return f"{url}|{json.dumps(headers, sort_keys=True)}"
+
+async def _open(url: str, headers: dict, buffer_if: Callable[[httpx.Response], bool], tee_if: Callable[[httpx.Response], bool] | None = None) -> UpstreamBody | httpx.Response:
+    # Segment'lerde yavaş edge'e karşı opsiyonel hedge
+    if segment_hedger.enabled and is_hls_segment(url):
+        response = await segment_hedger.send(shared_client, url, headers)
+    else:
+        req      = shared_client.build_request("GET", url, headers=headers)
+        response = await shared_client.send(req, stream=True)
+
+    # Hata ve koşullu isteğe 304 - gövde yok, herkesle paylaşılabilir
+    if response.status_code >= 400 or response.status_code == 304:
+        await response.aclose()
+        return UpstreamBody(response.status_code, response.headers, b"")
+
+    # Büyük/bilinmeyen boyutlu gövdeler açık stream olarak isteği başlatana döner;
+    # tee_if uyarsa stream bitince gövde bekleyenlerle paylaşılır
+    if not buffer_if(response):
+        if tee_if and tee_if(response):
+            key               = coalesce_key(url, headers)
+            # Sıkıştırılmış gövdenin Content-Length'i decode edilmiş tee boyutuyla karşılaştırılamaz
+            identity          = response.headers.get("content-encoding", "identity").strip().lower() in ("", "identity")
+            sink              = TeeSink(key, _content_length(response) if identity else 0)
+            _tees[key]        = sink
+            _tee_of[response] = sink
+        return response
+
+    # Belleğe alınacak gövde süreç geneli bütçeden yer ayırır. Rewrite için gövdesi şart olan
+    # manifest'ler kuyrukta bekler; diğerleri bütçe yoksa açık stream olarak döner
+    must_buffer = is_hls_response(url, response)
+    reserved    = _content_length(response) or UNKNOWN_BODY_RESERVE
+    if not await memory_budget.acquire(reserved, None if must_buffer else 0):
+        if not must_buffer:
+            return response
+        await response.aclose()
+        return UpstreamBody(503, response.headers, b"")
+
+    try:
+        content = await response.aread()
+    except BaseException:
+        memory_budget.release(reserved)
+        raise
+    finally:
+        await response.aclose()
+
+    # Rezervasyon gerçek boyuta çekilir ve gövde nesnesi yaşadıkça tutulur
+    memory_budget.resize(reserved, len(content))
+    body = UpstreamBody(response.status_code, response.headers, content)
+    finalize(body, memory_budget.release, len(content))
+    return body
+
+def _close_unclaimed(task: asyncio.Task):
+    """Lider istemci koptuysa sahipsiz kalan stream'i kapat"""
+    if task.cancelled() or task.exception():
+        return
+    if isinstance(response := task.result(), httpx.Response):
+        if sink := _tee_of.pop(response, None):
+            sink.abort()
+        asyncio.get_running_loop().create_task(response.aclose())
+
+def take_tee(response: httpx.Response, on_complete: Callable[[bytes], Awaitable]) -> TeeSink | None:
+    """Stream'in sahibi tee sink'ini alır - stream_wrapper'a verilir"""
+    sink = _tee_of.pop(response, None)
+    if sink:
+        sink.on_complete = on_complete
+    return sink
+
+async def fetch_shared(url: str, headers: dict, buffer_if: Callable[[httpx.Response], bool], tee_if: Callable[[httpx.Response], bool] | None = None) -> UpstreamBody | httpx.Response:
+    """
+    Eşzamanlı aynı GET'leri tek upstream isteğinde birleştirir.
+    - buffer_if True dönen yanıtlar okunup tüm bekleyenlerle paylaşılır (UpstreamBody)
+    - Aksi halde açık httpx.Response sadece isteği başlatana döner; tee_if uyarsa diğerleri
+      stream'in bitmesini bekleyip gövdeyi paylaşır, uymazsa kendi isteğini açar
+    - İstek ayrı task'ta çalışır; lider istemcinin kopması bekleyenleri etkilemez
+    """
+    key    = coalesce_key(url, headers)
+    task   = _inflight.get(key)
+    leader = task is None
+
+    if leader:
+        task           = asyncio.create_task(_open(url, headers, buffer_if, tee_if))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+
+    try:
+        result = await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if leader:
+            task.add_done_callback(_close_unclaimed)
+        raise
+
+    if isinstance(result, UpstreamBody) or leader:
+        return result
+
+    # Lider stream ediyor - gövde cache'lenebilirse tee'den chunk'lar geldikçe oku, gövdenin bitmesi beklenmez
+    if (sink := _tees.get(key)) is not None:
+        idle_timeout = shared_client.timeout.read or 60.0
+        if await sink.ready(idle_timeout):
+            return sink.follower(result, idle_timeout)
+
+    # Paylaşılamayan yanıt - bu istemci için ayrı istek
+    return await _open(url, headers, buffer_if)
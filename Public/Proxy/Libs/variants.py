@@ -0,0 +1,142 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from Settings import VARIANT_MAX_BANDWIDTH, VARIANT_MAX_HEIGHT, VARIANT_DEDUPE, VARIANT_PIN
+import re
+
+_ATTR = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+def _parse_attrs(line: str) -> dict[str, str]:
+    """'#EXT-X-STREAM-INF:BANDWIDTH=1,RESOLUTION=640x360' -> {"BANDWIDTH": "1", "RESOLUTION": "640x360"}"""
+    return {key: value.strip('"') for key, value in _ATTR.findall(line.split(":", 1)[1] if ":" in line else "")}
+
+class _Variant:
+    __slots__ = ("lines", "bandwidth", "height", "signature")
+
+    def __init__(self, lines: tuple[int, ...], attrs: dict[str, str]):
+        self.lines     = lines  # Varyanta ait satır index'leri (STREAM-INF + URI)
+        self.bandwidth = int(attrs["BANDWIDTH"]) if attrs.get("BANDWIDTH", "").isdigit() else 0
+        resolution     = attrs.get("RESOLUTION", "")
+        height         = resolution.partition("x")[2]
+        self.height    = int(height) if height.isdigit() else 0
+        self.signature = (resolution, attrs.get("CODECS", ""))
+
+class VariantFilter:
+    """
+    HLS master playlist varyant filtresi - proxy çıkış bant genişliği öngörülebilir kalsın
+    - max_bandwidth / max_height: üstündeki varyantlar (ve I-frame playlist'leri) atılır
+    - dedupe: aynı çözünürlük + codec'li tekrar eden varyantlardan ilki kalır
+    - pin: tek varyant bırakılır (lowest | highest | yükseklik - o yüksekliği aşmayan en iyisi)
+    - Filtre tüm varyantları elerse en düşük bant genişlikli olan bırakılır
+    """
+
+    _dropped  = 0  # Tüm filtreler genelinde atılan varyant sayısı
+    _filtered = 0  # Filtrelenen playlist sayısı
+
+    def __init__(self, max_bandwidth: int = 0, max_height: int = 0, dedupe: bool = False, pin: str = ""):
+        self.max_bandwidth = max_bandwidth
+        self.max_height    = max_height
+        self.dedupe        = dedupe
+        self.pin           = (pin or "").strip().lower()
+
+    @classmethod
+    def from_request(cls, force_proxy: bool, max_bandwidth: int | None = None, max_height: int | None = None, dedupe: str | None = None, pin: str | None = None) -> "VariantFilter":
+        """Query parametreleri + (force_proxy ise) sunucu limitleri - iki limit varsa küçüğü geçerli"""
+        def tighter(request_value: int | None, server_value: int) -> int:
+            values = [value for value in (request_value, server_value if force_proxy else 0) if value and value > 0]
+            return min(values) if values else 0
+
+        return cls(
+            max_bandwidth = tighter(max_bandwidth, VARIANT_MAX_BANDWIDTH),
+            max_height    = tighter(max_height, VARIANT_MAX_HEIGHT),
+            dedupe        = dedupe == "1" or (force_proxy and VARIANT_DEDUPE),
+            pin           = pin or (VARIANT_PIN if force_proxy else ""),
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.max_bandwidth or self.max_height or self.dedupe or self.pin)
+
+    @property
+    def key(self) -> str:
+        """Manifest cache anahtarı için - filtre sonucu etkiler"""
+        return f"{self.max_bandwidth}:{self.max_height}:{int(self.dedupe)}:{self.pin}" if self.active else ""
+
+    def _fits(self, variant: _Variant) -> bool:
+        if self.max_bandwidth and variant.bandwidth > self.max_bandwidth:
+            return False
+        return not (self.max_height and variant.height > self.max_height)
+
+    def _pick(self, variants: list[_Variant]) -> _Variant:
+        if self.pin == "lowest":
+            return min(variants, key=lambda variant: variant.bandwidth)
+        if self.pin.isdigit():
+            below = [variant for variant in variants if variant.height <= int(self.pin)]
+            if below:
+                return max(below, key=lambda variant: (variant.height, variant.bandwidth))
+            return min(variants, key=lambda variant: variant.bandwidth)
+        return max(variants, key=lambda variant: variant.bandwidth)  # highest
+
+    def apply(self, content: bytes) -> bytes:
+        """Master playlist'ten istenmeyen varyantları çıkarır; media playlist'lere dokunmaz"""
+        if not self.active or b"#EXT-X-STREAM-INF" not in content:
+            return content
+
+        try:
+            lines = content.decode("utf-8").split("\n")
+        except UnicodeDecodeError:
+            return content
+
+        variants : list[_Variant] = []
+        iframes  : list[_Variant] = []
+        pending                   = None
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith("#EXT-X-STREAM-INF:"):
+                pending = (index, _parse_attrs(stripped))
+            elif stripped.startswith("#EXT-X-I-FRAME-STREAM-INF:"):
+                iframes.append(_Variant((index,), _parse_attrs(stripped)))
+            elif pending and stripped and not stripped.startswith("#"):
+                variants.append(_Variant((pending[0], index), pending[1]))
+                pending = None
+
+        if not variants:
+            return content
+
+        keep = [variant for variant in variants if self._fits(variant)]
+
+        if self.dedupe:
+            seen, unique = set(), []
+            for variant in keep:
+                if variant.signature not in seen:
+                    seen.add(variant.signature)
+                    unique.append(variant)
+            keep = unique
+
+        if keep and self.pin:
+            keep = [self._pick(keep)]
+
+        if not keep:
+            keep = [min(variants, key=lambda variant: variant.bandwidth)]
+
+        kept = set(map(id, keep))
+        drop = {index for variant in variants if id(variant) not in kept for index in variant.lines}
+        drop.update(index for variant in iframes if not self._fits(variant) for index in variant.lines)
+        if not drop:
+            return content
+
+        VariantFilter._filtered += 1
+        VariantFilter._dropped  += len(variants) - len(keep)
+        return "\n".join(line for index, line in enumerate(lines) if index not in drop).encode("utf-8")
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        return {
+            "filtered_playlists" : cls._filtered,
+            "dropped_variants"   : cls._dropped,
+            "server_limits"      : {
+                "max_bandwidth" : VARIANT_MAX_BANDWIDTH,
+                "max_height"    : VARIANT_MAX_HEIGHT,
+                "dedupe"        : VARIANT_DEDUPE,
+                "pin"           : VARIANT_PIN,
+            },
+        }
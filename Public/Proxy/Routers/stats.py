@@ -0,0 +1,35 @@
+# Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
+
+from .                      import proxy_router
+from ..Libs.helpers         import shared_transport
+from ..Libs.segment_cache   import segment_cache
+from ..Libs.manifest_cache  import manifest_cache
+from ..Libs.range_cache     import range_cache
+from ..Libs.subtitle_cache  import subtitle_cache
+from ..Libs.prefetch        import segment_prefetcher
+from ..Libs.stream_stats    import stream_stats
+from ..Libs.hedge           import segment_hedger
+from ..Libs.header_profiles import header_profiles
+from ..Libs.memory_budget   import memory_budget
+from ..Libs.key_cache       import key_cache
+from ..Libs.variants        import VariantFilter
+from ..Libs.egress          import egress_scheduler
+
+@proxy_router.get("/stats")
+async def proxy_stats():
+    """Proxy cache, prefetch ve upstream bağlantı havuzu istatistikleri"""
+    return {
+        "pool"            : shared_transport.get_stats(),
+        "memory_budget"   : memory_budget.get_stats(),
+        "segment_cache"   : segment_cache.get_stats(),
+        "manifest_cache"  : manifest_cache.get_stats(),
+        "range_cache"     : range_cache.get_stats(),
+        "subtitle_cache"  : subtitle_cache.get_stats(),
+        "key_cache"       : key_cache.get_stats(),
+        "prefetch"        : segment_prefetcher.get_stats(),
+        "streams"         : stream_stats.get_stats(),
+        "egress"          : egress_scheduler.get_stats(),
+        "hedge"           : segment_hedger.get_stats(),
+        "header_profiles" : header_profiles.get_stats(),
+        "variant_filter"  : VariantFilter.get_stats(),
+    }
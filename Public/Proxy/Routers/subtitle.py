@@ -1,34 +1,41 @@
 # Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
 
-from fastapi        import Request, Response
-from .              import proxy_router
-from ..Libs.helpers import prepare_request_headers, process_subtitle_content, CORS_HEADERS, shared_client
+from fastapi               import Request, Response
+from .                     import proxy_router
+from ..Libs.helpers        import prepare_request_headers, strip_conditional, is_not_modified, not_modified_response, CORS_HEADERS
+from ..Libs.subtitle_cache import subtitle_cache
 
 @proxy_router.get("/subtitle")
 async def subtitle_proxy(request: Request, url: str, referer: str = None, user_agent: str = None):
     """Altyazı proxy endpoint'i"""
     try:
-        decoded_url     = url
-        request_headers = prepare_request_headers(request, decoded_url, referer, user_agent)
+        decoded_url = url
 
-        response = await shared_client.get(decoded_url, headers=request_headers)
+        # Popüler altyazılar bellekten - indirme ve dönüştürme yok
+        entry = subtitle_cache.get(decoded_url)
+        if entry is None:
+            request_headers = strip_conditional(prepare_request_headers(request, decoded_url, referer, user_agent))
+            request_headers.pop("Range", None)  # Cache'e her zaman tam dosya girer
 
-        if response.status_code >= 400:
-            return Response(
-                content     = f"Altyazı hatası: {response.status_code}",
-                status_code = response.status_code
-            )
+            entry = await subtitle_cache.fetch(decoded_url, request_headers)
+            if isinstance(entry, int):
+                return Response(
+                    content     = f"Altyazı hatası: {entry}",
+                    status_code = entry
+                )
 
-        processed_content = process_subtitle_content(
-            response.content,
-            response.headers.get("content-type", ""),
-            decoded_url
-        )
+        # Client'taki sürüm güncel - gövde gönderme
+        if is_not_modified(request, entry.etag, entry.last_modified):
+            return not_modified_response(entry.etag, entry.last_modified)
+
+        headers = {"Content-Type": "text/vtt; charset=utf-8", "ETag": entry.etag, **CORS_HEADERS}
+        if entry.last_modified:
+            headers["Last-Modified"] = entry.last_modified
 
         return Response(
-            content     = processed_content,
+            content     = entry.content,
             status_code = 200,
-            headers     = {"Content-Type": "text/vtt; charset=utf-8", **CORS_HEADERS},
+            headers     = headers,
             media_type  = "text/vtt"
         )
 
@@ -1,116 +1,424 @@
 # Bu araç @keyiflerolsun tarafından | @KekikAkademi için yazılmıştır.
 
-from CLI                  import konsol
-from fastapi              import Request, Response
-from starlette.background import BackgroundTask
-from fastapi.responses    import StreamingResponse
-from .                    import proxy_router
-from ..Libs.helpers       import prepare_request_headers, prepare_response_headers, detect_hls_from_url, stream_wrapper, rewrite_hls_manifest, is_hls_segment, shared_client, parse_extra_headers
-from ..Libs.segment_cache import segment_cache
+from CLI                    import konsol
+from fastapi                import Request, Response
+from starlette.background   import BackgroundTask
+from hashlib                import sha1
+from fastapi.responses      import StreamingResponse
+from .                      import proxy_router
+from ..Libs.helpers         import prepare_request_headers, prepare_response_headers, detect_hls_from_url, stream_wrapper, rewrite_hls_manifest, stream_hls_manifest, is_hls_segment, shared_client, parse_extra_headers, get_content_type, get_client_ip, get_validators, conditional_headers, strip_conditional, is_not_modified, not_modified_response, CORS_HEADERS
+from ..Libs.segment_cache   import segment_cache
+from ..Libs.upstream        import fetch_shared, take_tee, coalesce_key, UpstreamBody, TeeSink, is_hls_response, should_buffer, should_tee, SHARED_BODY_LIMIT
+from ..Libs.prefetch        import segment_prefetcher
+from ..Libs.manifest_cache  import manifest_cache
+from ..Libs.range_cache     import range_cache, parse_range, parse_content_range
+from ..Libs.header_profiles import header_profiles
+from ..Libs.key_cache       import key_cache
+from ..Libs.variants        import VariantFilter
+from ..Libs.egress          import egress_scheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_BULK
+from typing                 import AsyncIterator
+import httpx
 
 @proxy_router.get("/video")
 @proxy_router.head("/video")
-async def video_proxy(request: Request, url: str, referer: str = None, user_agent: str = None, force_proxy: str = None, title: str = None, subtitle_url: str = None, extra_headers: str = None):
+async def video_proxy(request: Request, url: str, referer: str = None, user_agent: str = None, force_proxy: str = None, title: str = None, subtitle_url: str = None, extra_headers: str = None, hp: str = None, key: str = None, max_bandwidth: int = None, max_height: int = None, dedupe: str = None, pin: str = None):
     """Video proxy endpoint'i"""
-    target_url           = url
-    parsed_extra_headers = parse_extra_headers(extra_headers)
+    target_url = url
+
+    # Rewrite edilmiş manifest'ten gelen istek: segment'lerde kısa id (depodan), playlist/key'lerde setin kendisi (restart sonrası da çözülür)
+    if hp:
+        if (profile := header_profiles.get(hp)) is None:
+            return Response(status_code=400, content="Invalid header profile")
+        referer, user_agent, parsed_extra_headers = profile
+    else:
+        parsed_extra_headers = parse_extra_headers(extra_headers)
+
     request_headers      = prepare_request_headers(request, target_url, referer, user_agent, parsed_extra_headers)
     is_force_proxy       = force_proxy == "1"
+    is_segment           = is_hls_segment(target_url)
+    variant_filter       = VariantFilter.from_request(is_force_proxy, max_bandwidth, max_height, dedupe, pin)
+
+    # force_proxy oynatımında istemcinin konumuna göre sıradaki segment'leri önden çek
+    if is_force_proxy:
+        segment_prefetcher.on_segment_request(target_url, get_client_ip(request))
 
     # HLS segment ise cache'i kontrol et
-    if is_hls_segment(target_url):
+    if is_segment:
         cached_content = await segment_cache.get(target_url)
         if cached_content:
             # konsol.print(f"[green]✓ Cache HIT:[/green] {target_url[-50:]}")
-            return Response(
-                content     = cached_content,
-                status_code = 200,
-                headers     = {
-                    "Content-Type"                : "video/MP2T" if target_url.endswith('.ts') else "video/iso.segment",
-                    "Cache-Control"               : "public, max-age=30",
-                    "Access-Control-Allow-Origin" : "*",
-                },
-            )
-
-    # Re-use global shared client
-    client = shared_client
+            return await _paced(request, target_url, PRIORITY_NORMAL, _cached_segment_response(request, target_url, cached_content, segment_cache.validators(target_url)))
+
+    # Rewriter'ın işaretlediği EXT-X-KEY anahtarı - küçük, çok tekrar eden gövde
+    if key == "1" and request.method == "GET" and "Range" not in request_headers:
+        return await _key_proxy(request, target_url, request_headers)
+
+    # Daha önce rewrite edilmiş playlist (live: yenileme penceresi içinde, VOD: uzun TTL)
+    manifest_key = None
+    if request.method == "GET" and "Range" not in request_headers and not is_segment:
+        manifest_key = manifest_cache.make_key(target_url, header_profiles.make_id(referer, user_agent, parsed_extra_headers), is_force_proxy, variant_filter.key)
+        if cached := manifest_cache.get(manifest_key):
+            content, headers = cached
+            header_profiles.register(referer, user_agent, parsed_extra_headers)  # İçerikteki kısa hp id'leri geçerli kalsın
+            if is_force_proxy:
+                segment_prefetcher.resume(target_url, request_headers, get_client_ip(request))
+            if is_not_modified(request, headers.get("Etag"), headers.get("Last-Modified")):
+                return not_modified_response(headers.get("Etag"), headers.get("Last-Modified"), headers.get("Cache-Control"))
+            return await _paced(request, target_url, PRIORITY_HIGH, Response(content=content, status_code=200, headers=headers, media_type=headers.get("Content-Type")))
+
+    # Cache'lenen HLS yanıtları için client'ın koşullu headerları upstream'e gitmez (tam gövde lazım),
+    # 304 kararı cache'teki/yeni sürüme göre burada verilir. Süresi dolmuş entry varsa upstream'e
+    # onun doğrulayıcılarıyla sorulur - değişmediyse gövde tekrar inmez.
+    stale = None
+    if is_segment or detect_hls_from_url(target_url):
+        request_headers = strip_conditional(request_headers)
+        if request.method == "GET" and "Range" not in request_headers:
+            if is_segment:
+                stale = segment_cache.get_stale(target_url)
+            elif manifest_key:
+                stale = manifest_cache.get_stale(manifest_key)
+        if stale:
+            request_headers = {**request_headers, **conditional_headers(stale[-1])}
 
     try:
-        # GET isteğini başlat
-        req      = client.build_request("GET", target_url, headers=request_headers)
-        response = await client.send(req, stream=True)
+        # HEAD isteği - upstream'e gövde transferi başlatmadan sor, sonucu meta cache'inde tut
+        if request.method == "HEAD":
+            return await _head_proxy(target_url, request_headers)
+
+        # Byte-range isteği (MP4 seek, EXT-X-BYTERANGE) - blok cache'inden karşıla
+        if "Range" in request_headers and not (detect_hls_from_url(target_url) and not is_segment):
+            if (ranged := await _range_proxy(request, target_url, strip_conditional(request_headers))) is not None:
+                return ranged
+
+        # GET isteğini başlat - aynı anda gelen aynı istekler tek upstream fetch'inde birleşir
+        # Varyant filtresi master playlist'in tamamını görmeli - filtreli istekte manifest hep okunur
+        response = await fetch_shared(target_url, request_headers, lambda r: should_buffer(target_url, r) or (variant_filter.active and is_hls_response(target_url, r)), lambda r: should_tee(target_url, r))
 
         if response.status_code >= 400:
-            await response.aclose()
             return Response(status_code=response.status_code, content=f"Upstream Error: {response.status_code}")
 
-        # 3. HLS Tespiti (URL + Header)
-        is_hls       = detect_hls_from_url(target_url)
-        content_type = response.headers.get("content-type", "").lower()
-        if "mpegurl" in content_type or "m3u8" in content_type:
-            is_hls = True
-
+        # Upstream 304: ya stale entry'miz doğrulandı ya da client'ın kendi koşullu isteği (uçtan uca)
+        if response.status_code == 304:
+            if stale is None:
+                return not_modified_response(response.headers.get("etag"), response.headers.get("last-modified"), response.headers.get("cache-control"))
+            if manifest_key:
+                header_profiles.register(referer, user_agent, parsed_extra_headers)  # İçerikteki kısa hp id'leri geçerli kalsın
+                if is_force_proxy:
+                    segment_prefetcher.resume(target_url, request_headers, get_client_ip(request))
+            return await _serve_revalidated(request, target_url, manifest_key, stale)
 
+        # 3. HLS Tespiti (URL + Header)
+        is_hls                = is_hls_response(target_url, response)
         detected_content_type = "application/vnd.apple.mpegurl" if is_hls else None
 
         # Response headerlarını hazırla
         final_headers = prepare_response_headers(dict(response.headers), target_url, detected_content_type)
-        # HEAD isteği ise stream yapma, kapat ve dön
-        if request.method == "HEAD":
-            await response.aclose()
-            return Response(
-                content     = b"",
-                status_code = response.status_code,
-                headers     = final_headers,
-                media_type  = final_headers.get("Content-Type")
-            )
+        validators    = get_validators(response.headers)
 
-        # HLS manifest ise içeriği yeniden yaz
-        if is_hls:
-            # Tüm içeriği oku
-            content = await response.aread()
-            await response.aclose()
+        # Paylaşılan (tamamen okunmuş) yanıt: manifest, küçük segment veya key
+        if isinstance(response, UpstreamBody):
+            content = response.content
+
+            # HLS manifest ise içeriği yeniden yaz
+            if is_hls:
+                # Master playlist'te istenmeyen varyantlar rewrite'tan önce atılır
+                content  = variant_filter.apply(content)
+                segments = [] if is_force_proxy and segment_prefetcher.enabled else None
+                content  = rewrite_hls_manifest(content, target_url, referer, user_agent, is_force_proxy, parsed_extra_headers, segments, header_profiles.register(referer, user_agent, parsed_extra_headers))
+                if segments:
+                    segment_prefetcher.register(target_url, request_headers, segments, b"#EXT-X-ENDLIST" in response.content, get_client_ip(request))
 
-            # Manifest URL'lerini yeniden yaz
-            rewritten_content = rewrite_hls_manifest(content, target_url, referer, user_agent, is_force_proxy, parsed_extra_headers)
+                # Content-Length güncelle; upstream ETag vermediyse rewrite sonucundan üret
+                final_headers["Content-Length"] = str(len(content))
+                final_headers.setdefault("Etag", f'"{sha1(content).hexdigest()[:20]}"')
 
-            # Content-Length güncelle
-            final_headers["Content-Length"] = str(len(rewritten_content))
+                if manifest_key and response.status_code == 200:
+                    manifest_cache.set(manifest_key, content, final_headers, manifest_cache.ttl_for(response.content), validators)
 
-            return Response(
-                content     = rewritten_content,
+            # HLS segment ise cache'e ekle (Range ile gelen kısmi yanıtlar hariç)
+            elif is_segment and response.status_code == 200:
+                await segment_cache.set(target_url, content, validators)
+
+            if response.status_code == 200 and is_not_modified(request, final_headers.get("Etag"), final_headers.get("Last-Modified")):
+                return not_modified_response(final_headers.get("Etag"), final_headers.get("Last-Modified"), final_headers.get("Cache-Control"))
+
+            return await _paced(request, target_url, PRIORITY_HIGH if is_hls else PRIORITY_NORMAL if is_segment else PRIORITY_BULK, Response(
+                content     = content,
                 status_code = response.status_code,
                 headers     = final_headers,
                 media_type  = final_headers.get("Content-Type")
-            )
-
-        # HLS segment ise ve boyutu <= 5MB ise cache'e al, aksi halde stream et
-        if is_hls_segment(target_url):
-            content_length = int(response.headers.get("content-length", "0"))
-            # Sadece bilinen ve makul boyutlu (<= 5MB) segmentleri belleğe al
-            if 0 < content_length <= 5 * 1024 * 1024:
-                content = await response.aread()
-                await response.aclose()
+            ))
 
-                # Cache'e ekle
-                await segment_cache.set(target_url, content)
+        # Büyük / boyutu bilinmeyen manifest - gövde beklenmeden satır satır rewrite edilerek akar.
+        # Upstream gövdesi tee ile bekleyenlere, rewrite sonucu sink ile manifest cache'ine gider
+        if is_hls:
+            final_headers.pop("Content-Length", None)
+            tee      = take_tee(response, None)
+            segments = [] if is_force_proxy and segment_prefetcher.enabled else None
+            sink     = TeeSink(target_url, 0)
+            body     = stream_hls_manifest(response, target_url, referer, user_agent, is_force_proxy, parsed_extra_headers, segments, header_profiles.register(referer, user_agent, parsed_extra_headers), tee, sink)
 
-                return Response(
-                    content     = content,
-                    status_code = response.status_code,
-                    headers     = final_headers,
-                    media_type  = final_headers.get("Content-Type")
-                )
+            async def on_rewritten(content: bytes):
+                if segments:
+                    segment_prefetcher.register(target_url, request_headers, segments, b"#EXT-X-ENDLIST" in content, get_client_ip(request))
+                if manifest_key and response.status_code == 200:
+                    headers = {**final_headers, "Content-Length": str(len(content))}
+                    headers.setdefault("Etag", f'"{sha1(content).hexdigest()[:20]}"')
+                    manifest_cache.set(manifest_key, content, headers, manifest_cache.ttl_for(content), validators)
+
+            sink.on_complete = on_rewritten
+            priority         = PRIORITY_HIGH
+        else:
+            # Normal video veya segment - ilk byte beklemeden akar, gövde tamamlanırsa tee ile cache'e girer
+            tee      = take_tee(response, lambda body: segment_cache.set(target_url, body, validators))
+            sink     = None
+            body     = stream_wrapper(response, tee)
+            priority = PRIORITY_NORMAL if is_segment else PRIORITY_BULK
+
+        # Client'taki sürüm güncel - stream'i açmadan kapat (tee bekleyenleri kendi isteğine döner)
+        if response.status_code == 200 and is_not_modified(request, final_headers.get("Etag"), final_headers.get("Last-Modified")):
+            await _close_stream(response, tee, sink)
+            return not_modified_response(final_headers.get("Etag"), final_headers.get("Last-Modified"), final_headers.get("Cache-Control"))
 
-        # Normal video veya büyük/chunked segment - StreamingResponse döndür
         return StreamingResponse(
-            stream_wrapper(response),
+            egress_scheduler.pace(body, get_client_ip(request), target_url, priority),
             status_code = response.status_code,
             headers     = final_headers,
             media_type  = final_headers.get("Content-Type"),
-            background  = BackgroundTask(response.aclose)
+            background  = BackgroundTask(_close_stream, response, tee, sink)
         )
 
     except Exception as e:
         konsol.print(f"[red]Proxy başlatma hatası: {str(e)}[/red]")
         return Response(status_code=502, content=f"Proxy Error: {str(e)}")
+
+async def _paced(request: Request, target_url: str, priority: int, response: Response) -> Response:
+    """Bellekten sunulan gövde de çıkış limitlerine ve IP sayaçlarına girer"""
+    if response.body:
+        await egress_scheduler.charge(len(response.body), get_client_ip(request), target_url, priority)
+    return response
+
+def _cached_segment_response(request: Request, target_url: str, content: bytes, validators: tuple | None) -> Response:
+    """Cache'teki segment - client'taki sürüm güncelse 304"""
+    etag, last_modified = validators or (None, None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified, "public, max-age=30")
+
+    headers = {
+        "Content-Type"                : "video/MP2T" if target_url.endswith('.ts') else "video/iso.segment",
+        "Cache-Control"               : "public, max-age=30",
+        "Access-Control-Allow-Origin" : "*",
+    }
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+
+    return Response(content=content, status_code=200, headers=headers)
+
+async def _serve_revalidated(request: Request, target_url: str, manifest_key: str | None, stale: tuple) -> Response:
+    """Upstream 304 ile doğrulanan stale cache entry'sini tazeleyip sunar"""
+    if not manifest_key:
+        content, validators = stale
+        await segment_cache.set(target_url, content, validators)
+        return await _paced(request, target_url, PRIORITY_NORMAL, _cached_segment_response(request, target_url, content, validators))
+
+    content, headers, _ = stale
+    manifest_cache.refresh(manifest_key)
+
+    if is_not_modified(request, headers.get("Etag"), headers.get("Last-Modified")):
+        return not_modified_response(headers.get("Etag"), headers.get("Last-Modified"), headers.get("Cache-Control"))
+
+    return await _paced(request, target_url, PRIORITY_HIGH, Response(content=content, status_code=200, headers=headers, media_type=headers.get("Content-Type")))
+
+async def _close_stream(response, tee, sink=None):
+    """Stream hiç başlamadan client koptuysa tee'yi bekleyenler takılı kalmasın"""
+    for collector in (tee, sink):
+        if collector:
+            collector.abort()
+    await response.aclose()
+
+async def _key_proxy(request: Request, target_url: str, request_headers: dict) -> Response:
+    """
+    EXT-X-KEY anahtarını key cache'inden ya da tek (paylaşılan) upstream isteğiyle döndürür.
+    Gövde anahtar olamayacak kadar büyükse açılmış upstream yanıtı cache'lenmeden akar (ikinci istek yok).
+    """
+    request_headers = strip_conditional(request_headers)
+    cache_key       = coalesce_key(target_url, request_headers)
+
+    if (cached := key_cache.get(cache_key)) is None:
+        response = await fetch_shared(target_url, request_headers, lambda r: 0 < int(r.headers.get("content-length", "0") or "0") <= SHARED_BODY_LIMIT)
+        if not isinstance(response, UpstreamBody):
+            # Boyutu bilinmeyen (chunked) gövde limite kadar okunur; aşarsa okunan kısım + kalanı akar
+            content, head, rest = await _read_upto(response, SHARED_BODY_LIMIT)
+            if content is None:
+                return StreamingResponse(
+                    egress_scheduler.pace(_resume_stream(response, head, rest), get_client_ip(request), target_url, PRIORITY_BULK),
+                    status_code = response.status_code,
+                    headers     = prepare_response_headers(dict(response.headers), target_url),
+                    background  = BackgroundTask(response.aclose)
+                )
+            response = UpstreamBody(response.status_code, response.headers, content)
+
+        if response.status_code >= 400:
+            return Response(status_code=response.status_code, content=f"Upstream Error: {response.status_code}")
+
+        cached = (response.content, response.headers.get("content-type") or "application/octet-stream")
+        if response.status_code == 200:
+            key_cache.set(cache_key, *cached)
+
+    content, content_type = cached
+    return await _paced(request, target_url, PRIORITY_HIGH, Response(
+        content     = content,
+        status_code = 200,
+        headers     = {**CORS_HEADERS, "Content-Type": content_type, "Cache-Control": "private, max-age=60"},
+        media_type  = content_type
+    ))
+
+async def _read_upto(response: httpx.Response, limit: int) -> tuple[bytes | None, list[bytes], AsyncIterator[bytes]]:
+    """Gövde limit içinde biterse tamamı; aşarsa None + okunan chunk'lar + kalan chunk iterator'ı"""
+    chunks = response.aiter_bytes()
+    head   = []
+    if int(response.headers.get("content-length", "0") or "0") > limit:
+        return None, head, chunks
+
+    size = 0
+    try:
+        async for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                return None, head, chunks
+    except BaseException:
+        await response.aclose()
+        raise
+
+    await response.aclose()
+    return b"".join(head), head, chunks
+
+async def _resume_stream(response: httpx.Response, head: list[bytes], rest: AsyncIterator[bytes]):
+    try:
+        for chunk in head:
+            yield chunk
+        async for chunk in rest:
+            yield chunk
+    finally:
+        await response.aclose()
+
+def _head_response(status_code: int, headers: dict) -> Response:
+    return Response(content=b"", status_code=status_code, headers=headers, media_type=headers.get("Content-Type"))
+
+async def _head_proxy(target_url: str, request_headers: dict) -> Response:
+    """
+    HEAD isteğini upstream HEAD ile karşılar; HEAD'i reddeden ya da boyut vermeyen origin'lere
+    tek byte'lık Range GET ile düşer. Dosya boyutu / tipi / doğrulayıcılar range_cache meta'sına
+    yazılır - sonraki HEAD ve Range istekleri upstream'e gitmez.
+    """
+    if (meta := range_cache.get_meta(target_url)) is not None:
+        total, content_type, validators = meta
+        headers = {**CORS_HEADERS, "Content-Type": content_type, "Content-Length": str(total), "Accept-Ranges": "bytes"}
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                headers["Etag"] = etag
+            if last_modified:
+                headers["Last-Modified"] = last_modified
+        return _head_response(200, headers)
+
+    request_headers = {k: v for k, v in request_headers.items() if k.lower() != "range"}
+    response        = await shared_client.send(shared_client.build_request("HEAD", target_url, headers=request_headers))
+    if response.status_code in (404, 410):
+        return Response(status_code=response.status_code, content=f"Upstream Error: {response.status_code}")
+
+    total = int(response.headers.get("content-length", "0") or "0") if response.status_code == 200 else 0
+
+    # HEAD'i reddeden (405, 501, 403...) ya da boyut vermeyen origin - ilk byte'ı iste, boyut Content-Range'den
+    if response.status_code >= 400 or (response.status_code == 200 and not total):
+        request  = shared_client.build_request("GET", target_url, headers={**request_headers, "Range": "bytes=0-0"})
+        response = await shared_client.send(request, stream=True)
+        await response.aclose()
+
+        if response.status_code >= 400:
+            return Response(status_code=response.status_code, content=f"Upstream Error: {response.status_code}")
+
+        content_range = parse_content_range(response.headers.get("content-range", ""))
+        if response.status_code == 206 and content_range and content_range[2] is not None:
+            total = content_range[2]
+        elif response.status_code == 200:
+            total = int(response.headers.get("content-length", "0") or "0")
+            range_cache.mark_unsupported(target_url)  # Range yok sayıldı
+
+    is_hls        = is_hls_response(target_url, response)
+    final_headers = prepare_response_headers({k: v for k, v in response.headers.items() if k.lower() not in ("content-range", "content-length")}, target_url, "application/vnd.apple.mpegurl" if is_hls else None)
+    if total:
+        final_headers["Content-Length"] = str(total)
+
+    # Manifest'in boyutu rewrite sonrası değişir - meta'ya yazılmaz
+    if is_hls or not total or response.status_code not in (200, 206):
+        return _head_response(200 if response.status_code == 206 else response.status_code, final_headers)
+
+    range_cache.set_meta(target_url, total, final_headers["Content-Type"], get_validators(response.headers))
+    return _head_response(200, final_headers)
+
+async def _range_proxy(request: Request, target_url: str, request_headers: dict) -> Response | None:
+    """
+    Tekil Range isteğini blok cache'i üzerinden 206 olarak döndürür.
+    Upstream Range desteklemiyorsa / dosya boyutu öğrenilemiyorsa None döner (normal akış).
+    """
+    if range_cache.is_unsupported(target_url) or (requested := parse_range(request_headers["Range"])) is None:
+        return None
+
+    start, end = requested
+    meta       = range_cache.get_meta(target_url)
+    if meta is None:
+        # İstenen byte'ı içeren hizalı bloğu çek - toplam boyut Content-Range'den öğrenilir
+        block_size  = range_cache.block_size
+        index       = (start or 0) // block_size
+        req_headers = {**request_headers, "Range": f"bytes={index * block_size}-{(index + 1) * block_size - 1}"}
+        response    = await fetch_shared(target_url, req_headers, lambda r: r.status_code == 206 and 0 < int(r.headers.get("content-length", "0") or "0") <= block_size)
+
+        content_range = parse_content_range(response.headers.get("content-range", ""))
+        if not isinstance(response, UpstreamBody) or response.status_code != 206 or not content_range or content_range[2] is None:
+            if isinstance(response, UpstreamBody):
+                if response.status_code < 400:
+                    range_cache.mark_unsupported(target_url)
+            else:
+                await response.aclose()
+                # Bellek bütçesi yetmediği için okunmamış hizalı blok - desteklenmiyor sayılmaz
+                if response.status_code != 206 or int(response.headers.get("content-length", "0") or "0") > block_size:
+                    range_cache.mark_unsupported(target_url)
+            return None
+
+        block_start, block_end, total = content_range
+        content_type                  = get_content_type(target_url, response.headers)
+        meta                          = (total, content_type, get_validators(response.headers))
+        range_cache.set_meta(target_url, *meta)
+
+        # Tam blok ya da dosyanın son bloğu ise sakla
+        if block_start == index * block_size and len(response.content) == block_end - block_start + 1 and (len(response.content) == block_size or block_end == total - 1):
+            range_cache.set_block(target_url, index, response.content)
+
+    total, content_type, _ = meta
+
+    # Suffix (bytes=-n) ve açık uçlu (bytes=a-) aralıklar
+    if start is None:
+        start, end = max(0, total - end), total - 1
+    elif end is None or end >= total:
+        end = total - 1
+
+    if start >= total:
+        return Response(status_code=416, headers={**CORS_HEADERS, "Content-Range": f"bytes */{total}"})
+
+    headers = {
+        **CORS_HEADERS,
+        "Content-Type"   : content_type,
+        "Content-Range"  : f"bytes {start}-{end}/{total}",
+        "Content-Length" : str(end - start + 1),
+        "Accept-Ranges"  : "bytes",
+    }
+    return StreamingResponse(
+        egress_scheduler.pace(range_cache.iter_range(target_url, request_headers, start, end, total), get_client_ip(request), target_url, PRIORITY_BULK),
+        status_code = 206,
+        headers     = headers,
+        media_type  = content_type
+    )
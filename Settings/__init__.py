@@ -47,3 +47,83 @@ if _is_valid_proxy(http_proxy) and _is_valid_proxy(https_proxy):
     }
 else:
     PROXIES = None
+
+# Proxy katmanı ayarları (AYAR.yml > PROXY bloğu, PROXY_<ANAHTAR> env ile ezilebilir)
+_PROXY_AYAR = AYAR.get("PROXY") or {}
+
+def _proxy_ayar(anahtar: str, varsayilan):
+    """env > AYAR.yml > varsayılan sırasıyla okur ve değeri varsayılanın tipine çevirir"""
+    deger = os.getenv(f"PROXY_{anahtar}")
+    if deger is None:
+        deger = _PROXY_AYAR.get(anahtar)
+    if deger is None or str(deger).strip() == "":
+        return varsayilan
+
+    if isinstance(varsayilan, bool):
+        return str(deger).strip().lower() in ("1", "true", "yes", "on")
+    try:
+        return type(varsayilan)(deger)
+    except (TypeError, ValueError):
+        return varsayilan
+
+# Segment cache L2 (disk/tmpfs) katmanı - dizin boşsa kapalı
+SEGMENT_L2_DIR     = _proxy_ayar("L2_DIR", "")
+SEGMENT_L2_SIZE_MB = _proxy_ayar("L2_SIZE_MB", 1024)
+SEGMENT_L2_TTL     = _proxy_ayar("L2_TTL", 300)
+
+# force_proxy HLS'de sıradaki segment'leri önden çekme - 0 = kapalı
+PREFETCH_SEGMENTS    = _proxy_ayar("PREFETCH_SEGMENTS", 3)
+PREFETCH_CONCURRENCY = _proxy_ayar("PREFETCH_CONCURRENCY", 2)
+PREFETCH_IDLE        = _proxy_ayar("PREFETCH_IDLE", 30)
+
+# Rewrite edilmiş HLS playlist cache'i
+MANIFEST_CACHE_MB       = _proxy_ayar("MANIFEST_CACHE_MB", 16)
+MANIFEST_VOD_TTL        = _proxy_ayar("MANIFEST_VOD_TTL", 3600)
+MANIFEST_LIVE_TTL_RATIO = _proxy_ayar("MANIFEST_LIVE_TTL_RATIO", 0.5)
+MANIFEST_STREAM_KB      = _proxy_ayar("MANIFEST_STREAM_KB", 512)
+
+# Byte-range blok cache'i (MP4 seek / EXT-X-BYTERANGE)
+RANGE_CACHE_MB = _proxy_ayar("RANGE_CACHE_MB", 64)
+RANGE_BLOCK_KB = _proxy_ayar("RANGE_BLOCK_KB", 1024)
+
+# Upstream bağlantı havuzu (shared_client)
+POOL_HTTP2            = _proxy_ayar("HTTP2", True)
+POOL_MAX_CONNECTIONS  = _proxy_ayar("POOL_MAX_CONNECTIONS", 200)
+POOL_MAX_KEEPALIVE    = _proxy_ayar("POOL_MAX_KEEPALIVE", 50)
+POOL_KEEPALIVE_EXPIRY = _proxy_ayar("POOL_KEEPALIVE_EXPIRY", 30.0)
+POOL_PER_HOST         = _proxy_ayar("POOL_PER_HOST", 0)
+
+# Dönüştürülmüş altyazı (VTT) cache'i
+SUBTITLE_CACHE_MB = _proxy_ayar("SUBTITLE_CACHE_MB", 16)
+SUBTITLE_TTL      = _proxy_ayar("SUBTITLE_TTL", 3600)
+SUBTITLE_MAX_KB   = _proxy_ayar("SUBTITLE_MAX_KB", 4096)
+
+# Yavaş segment fetch'lerinde ikinci (hedge) istek - varsayılan kapalı
+HEDGE_ENABLED      = _proxy_ayar("HEDGE_ENABLED", False)
+HEDGE_PERCENTILE   = _proxy_ayar("HEDGE_PERCENTILE", 95.0)
+HEDGE_BUDGET       = _proxy_ayar("HEDGE_BUDGET", 0.1)
+HEDGE_MIN_DELAY_MS = _proxy_ayar("HEDGE_MIN_DELAY_MS", 50)
+
+# Rewrite edilen URL'lerde header seti yerine kısa profil id'si (hp)
+HEADER_PROFILES    = _proxy_ayar("HEADER_PROFILES", True)
+HEADER_PROFILE_TTL = _proxy_ayar("HEADER_PROFILE_TTL", 21600)
+
+# Belleğe okunan upstream gövdeleri için süreç geneli byte bütçesi
+MEMORY_BUDGET_MB     = _proxy_ayar("MEMORY_BUDGET_MB", 256)
+MEMORY_QUEUE_TIMEOUT = _proxy_ayar("MEMORY_QUEUE_TIMEOUT", 5.0)
+
+# EXT-X-KEY anahtar cache'i
+KEY_CACHE_TTL = _proxy_ayar("KEY_CACHE_TTL", 300)
+KEY_CACHE_MB  = _proxy_ayar("KEY_CACHE_MB", 4)
+
+# force_proxy master playlist varyant filtresi - 0 / boş = kapalı
+VARIANT_MAX_BANDWIDTH = _proxy_ayar("VARIANT_MAX_BANDWIDTH", 0)
+VARIANT_MAX_HEIGHT    = _proxy_ayar("VARIANT_MAX_HEIGHT", 0)
+VARIANT_DEDUPE        = _proxy_ayar("VARIANT_DEDUPE", False)
+VARIANT_PIN           = _proxy_ayar("VARIANT_PIN", "")
+
+# Proxy çıkış bant genişliği - Mbit/s, 0 = limitsiz
+EGRESS_GLOBAL_MBPS = _proxy_ayar("EGRESS_GLOBAL_MBPS", 0.0)
+EGRESS_CLIENT_MBPS = _proxy_ayar("EGRESS_CLIENT_MBPS", 0.0)
+EGRESS_STREAM_MBPS = _proxy_ayar("EGRESS_STREAM_MBPS", 0.0)
+EGRESS_BURST_KB    = _proxy_ayar("EGRESS_BURST_KB", 256)